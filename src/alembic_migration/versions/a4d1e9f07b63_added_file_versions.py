@@ -0,0 +1,63 @@
+"""added_file_versions
+
+Revision ID: a4d1e9f07b63
+Revises: f2b86d41c9a7
+Create Date: 2026-10-18 16:27:13.640051
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d1e9f07b63"
+down_revision: Union[str, Sequence[str], None] = "f2b86d41c9a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "files",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+    op.add_column("files", sa.Column("previous_version_id", sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        op.f("fk_files_previous_version_id_files"),
+        "files",
+        "files",
+        ["previous_version_id"],
+        ["id"],
+    )
+    op.add_column("chunks", sa.Column("content_hash", sa.String(), nullable=True))
+    op.create_index(op.f("ix_chunks_file_id"), "chunks", ["file_id"], unique=False)
+    op.add_column(
+        "ingest_jobs", sa.Column("replaces_file_id", sa.UUID(), nullable=True)
+    )
+    op.create_foreign_key(
+        op.f("fk_ingest_jobs_replaces_file_id_files"),
+        "ingest_jobs",
+        "files",
+        ["replaces_file_id"],
+        ["id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        op.f("fk_ingest_jobs_replaces_file_id_files"),
+        "ingest_jobs",
+        type_="foreignkey",
+    )
+    op.drop_column("ingest_jobs", "replaces_file_id")
+    op.drop_index(op.f("ix_chunks_file_id"), table_name="chunks")
+    op.drop_column("chunks", "content_hash")
+    op.drop_constraint(
+        op.f("fk_files_previous_version_id_files"), "files", type_="foreignkey"
+    )
+    op.drop_column("files", "previous_version_id")
+    op.drop_column("files", "version")
@@ -0,0 +1,38 @@
+"""scoped_file_hash_to_live_versions
+
+Revision ID: b1f4e6a2d508
+Revises: d8b2f5c3e916
+Create Date: 2026-10-18 21:14:37.508126
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b1f4e6a2d508"
+down_revision: Union[str, Sequence[str], None] = "d8b2f5c3e916"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_constraint("uq_file_hash_user_id", "files", type_="unique")
+    op.create_index(
+        "uq_file_hash_user_id",
+        "files",
+        ["file_hash", "user_id"],
+        unique=True,
+        postgresql_where=sa.text("status != 'superseded'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("uq_file_hash_user_id", table_name="files")
+    op.create_unique_constraint(
+        "uq_file_hash_user_id", "files", ["file_hash", "user_id"]
+    )
@@ -0,0 +1,59 @@
+"""added_ingest_jobs_table
+
+Revision ID: b7c41e2d9f10
+Revises: 9a1e0817f04e
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7c41e2d9f10"
+down_revision: Union[str, Sequence[str], None] = "9a1e0817f04e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "ingest_jobs",
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("spool_path", sa.String(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("stage", sa.String(), nullable=True),
+        sa.Column("progress", sa.Float(), nullable=False),
+        sa.Column("file_id", sa.UUID(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("timings", sa.JSON(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("started_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["file_id"], ["files.id"], name=op.f("fk_ingest_jobs_file_id_files")
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["user.uuid"], name=op.f("fk_ingest_jobs_user_id_user")
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_ingest_jobs")),
+    )
+    op.create_index(
+        op.f("ix_ingest_jobs_user_id"), "ingest_jobs", ["user_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_ingest_jobs_user_id"), table_name="ingest_jobs")
+    op.drop_table("ingest_jobs")
@@ -0,0 +1,32 @@
+"""added_ingest_job_hash_and_size
+
+Revision ID: c3d9a8e51f27
+Revises: b7c41e2d9f10
+Create Date: 2026-10-18 11:04:52.187330
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d9a8e51f27"
+down_revision: Union[str, Sequence[str], None] = "b7c41e2d9f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("ingest_jobs", sa.Column("file_hash", sa.String(), nullable=True))
+    op.add_column(
+        "ingest_jobs", sa.Column("size_bytes", sa.BigInteger(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("ingest_jobs", "size_bytes")
+    op.drop_column("ingest_jobs", "file_hash")
@@ -0,0 +1,30 @@
+"""added_file_updated_at
+
+Revision ID: c6a3d9e1f472
+Revises: b1f4e6a2d508
+Create Date: 2026-10-18 22:05:11.842019
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c6a3d9e1f472"
+down_revision: Union[str, Sequence[str], None] = "b1f4e6a2d508"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "files", sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("files", "updated_at")
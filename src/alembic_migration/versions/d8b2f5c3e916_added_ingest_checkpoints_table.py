@@ -0,0 +1,47 @@
+"""added_ingest_checkpoints_table
+
+Revision ID: d8b2f5c3e916
+Revises: a4d1e9f07b63
+Create Date: 2026-10-18 18:02:41.317206
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d8b2f5c3e916"
+down_revision: Union[str, Sequence[str], None] = "a4d1e9f07b63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "ingest_checkpoints",
+        sa.Column("file_id", sa.UUID(), nullable=False),
+        sa.Column("batch_number", sa.Integer(), nullable=False),
+        sa.Column("batch_hash", sa.String(), nullable=False),
+        sa.Column("start_index", sa.Integer(), nullable=False),
+        sa.Column("chunk_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["file_id"], ["files.id"], name=op.f("fk_ingest_checkpoints_file_id_files")
+        ),
+        sa.PrimaryKeyConstraint(
+            "file_id", "batch_number", name=op.f("pk_ingest_checkpoints")
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("ingest_checkpoints")
@@ -0,0 +1,41 @@
+"""added_chunk_embeddings_table
+
+Revision ID: e5a0c7b3d214
+Revises: c3d9a8e51f27
+Create Date: 2026-10-18 13:41:09.552803
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a0c7b3d214"
+down_revision: Union[str, Sequence[str], None] = "c3d9a8e51f27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "chunk_embeddings",
+        sa.Column("content_hash", sa.String(), nullable=False),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("dimensions", sa.Integer(), nullable=False),
+        sa.Column("vector", sa.LargeBinary(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("content_hash", name=op.f("pk_chunk_embeddings")),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("chunk_embeddings")
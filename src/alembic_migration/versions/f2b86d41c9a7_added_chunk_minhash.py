@@ -0,0 +1,56 @@
+"""added_chunk_minhash
+
+Revision ID: f2b86d41c9a7
+Revises: e5a0c7b3d214
+Create Date: 2026-10-18 15:02:47.918264
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2b86d41c9a7"
+down_revision: Union[str, Sequence[str], None] = "e5a0c7b3d214"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("chunks", sa.Column("minhash", sa.LargeBinary(), nullable=True))
+    op.create_table(
+        "chunk_minhash_bands",
+        sa.Column("chunk_id", sa.UUID(), nullable=False),
+        sa.Column("band_key", sa.BigInteger(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["chunk_id"],
+            ["chunks.id"],
+            name=op.f("fk_chunk_minhash_bands_chunk_id_chunks"),
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["user.uuid"], name=op.f("fk_chunk_minhash_bands_user_id_user")
+        ),
+        sa.PrimaryKeyConstraint(
+            "chunk_id", "band_key", name=op.f("pk_chunk_minhash_bands")
+        ),
+    )
+    op.create_index(
+        "ix_chunk_minhash_bands_user_id_band_key",
+        "chunk_minhash_bands",
+        ["user_id", "band_key"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_chunk_minhash_bands_user_id_band_key", table_name="chunk_minhash_bands"
+    )
+    op.drop_table("chunk_minhash_bands")
+    op.drop_column("chunks", "minhash")
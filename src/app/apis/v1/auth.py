@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_login import LoginManager
 from fastapi_login.exceptions import InvalidCredentialsException
@@ -25,6 +25,20 @@ async def load_user(username: str) -> User | None:
         return user
 
 
+async def superuser(user: User = Depends(manager)) -> User:
+    """Dependency letting only authenticated superusers through.
+
+    Raises:
+        HTTPException: 403 when the user is not a superuser.
+    """
+    if not user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Superuser privileges required",
+        )
+    return user
+
+
 @router.post("/register")
 async def register(
     data: UserCreate,
@@ -1,9 +1,7 @@
 from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
 
 from app.apis.v1.auth import manager
-from app.core.db.database import async_get_db
 from app.core.logging import get_logger
 from app.schemas.chat import ChatRequest
 from app.services.chat_service import ChatService
@@ -13,10 +11,9 @@ logger = get_logger(__name__)
 
 
 @router.post("/chat")
-async def chat(
-    req: ChatRequest, db: Session = Depends(async_get_db), user=Depends(manager)
-):
-    service = ChatService(db)
+async def chat(req: ChatRequest, user=Depends(manager)):
+    # No request-scoped session: it would pin a connection for the whole stream.
+    service = ChatService()
     conversation_id = await service.validate_or_create_conversation_id(
         req.conversation_id, user.uuid
     )
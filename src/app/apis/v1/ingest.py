@@ -1,17 +1,77 @@
-from fastapi import APIRouter, Depends, UploadFile
+import uuid
+
+from fastapi import APIRouter, Depends, Request, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.apis.v1.auth import manager
 from app.core.db.database import async_get_db
+from app.schemas.ingest import (
+    IngestJobAccepted,
+    IngestJobStatus,
+    IngestPrecheckRequest,
+    IngestPrecheckResult,
+    IngestRecordsResult,
+)
+from app.services.ingest_job_service import IngestJobService
 from app.services.ingest_service import IngestService
 
 router = APIRouter()
 
 
-@router.post("/ingest")
+@router.post(
+    "/ingest", status_code=status.HTTP_202_ACCEPTED, response_model=IngestJobAccepted
+)
 async def ingest_file(
-    file: UploadFile, db: Session = Depends(async_get_db), user=Depends(manager)
+    file: UploadFile,
+    replaces: uuid.UUID | None = None,
+    db: Session = Depends(async_get_db),
+    user=Depends(manager),
+):
+    service = IngestJobService(db)
+    job = await service.submit(file, user_id=user.uuid, replaces=replaces)
+    return {"job_id": job.id, "status": job.status}
+
+
+@router.post("/ingest/precheck", response_model=IngestPrecheckResult)
+async def ingest_precheck(
+    req: IngestPrecheckRequest,
+    db: Session = Depends(async_get_db),
+    user=Depends(manager),
+):
+    service = IngestJobService(db)
+    return await service.precheck(req.files, user_id=user.uuid)
+
+
+@router.post("/ingest/batch")
+async def ingest_batch(
+    files: list[UploadFile],
+    db: Session = Depends(async_get_db),
+    user=Depends(manager),
+):
+    service = IngestJobService(db)
+    jobs, rejected = await service.submit_batch(files, user_id=user.uuid)
+    return StreamingResponse(
+        service.stream_batch(jobs, rejected),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@router.post("/ingest/records", response_model=IngestRecordsResult)
+async def ingest_records(
+    request: Request,
+    source: str = "records",
+    db: Session = Depends(async_get_db),
+    user=Depends(manager),
 ):
     service = IngestService(db)
-    response = await service.ingest(file, user_id=user.uuid)
-    return response
+    return await service.import_records(request.stream(), source, user_id=user.uuid)
+
+
+@router.get("/ingest/jobs/{job_id}", response_model=IngestJobStatus)
+async def ingest_job_status(
+    job_id: uuid.UUID, db: Session = Depends(async_get_db), user=Depends(manager)
+):
+    service = IngestJobService(db)
+    return await service.get_status(job_id, user_id=user.uuid)
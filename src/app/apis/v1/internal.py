@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends
+
+from app.apis.v1.auth import superuser
+from app.core.answer_cache import answer_cache
+from app.core.audit_sink import audit_sink
+from app.core.db.database import async_engine, replica_router
+from app.core.registry import registry
+from app.core.write_behind import write_behind
+from app.services.embedding_writer import write_stats
+from app.services.job_queue import job_queue
+from app.utils.chains import chain_pool
+
+router = APIRouter(tags=["internal"], dependencies=[Depends(superuser)])
+
+
+@router.get("/internal/stats")
+async def stats():
+    """Return runtime statistics of the process-wide shared components."""
+    return {
+        "registry": registry.stats(),
+        "chain_pool": chain_pool.stats(),
+        "answer_cache": answer_cache.stats(),
+        "ingest_queue": job_queue.stats(),
+        "embedding_writes": write_stats(),
+        "write_behind": write_behind.stats(),
+        "audit": audit_sink.stats(),
+        "db_pool": async_engine.pool.stats(),
+        "db_replica": replica_router.stats(),
+    }
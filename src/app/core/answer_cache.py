@@ -0,0 +1,118 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.core.config import settings
+
+
+@dataclass
+class CachedAnswer:
+    vector: np.ndarray
+    chunk_ids: frozenset[str]
+    answer: str
+    expires_at: float
+
+
+def _unit(vector) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm else array
+
+
+class AnswerCache:
+    """Per-user semantic cache of final LLM answers.
+
+    A lookup hits when a cached query of the same user is within
+    ``similarity_threshold`` (cosine) of the new query *and* the retrieval
+    returned exactly the same set of chunk ids. The chunk id check makes the
+    cache self-invalidating: once ingestion changes what a question retrieves,
+    the old answer no longer matches.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float,
+        max_entries_per_user: int,
+        max_users: int,
+        ttl_seconds: float,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries_per_user = max_entries_per_user
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._users: OrderedDict[uuid.UUID, list[CachedAnswer]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def lookup(self, user_id: uuid.UUID, vector, chunk_ids) -> str | None:
+        """Return a cached answer for a similar query over the same chunks."""
+        query = _unit(vector)
+        chunk_ids = frozenset(chunk_ids)
+        now = time.monotonic()
+        with self._lock:
+            entries = [e for e in self._users.get(user_id, []) if e.expires_at > now]
+            candidates = [e for e in entries if e.chunk_ids == chunk_ids]
+            if user_id in self._users:
+                self._users[user_id] = entries
+                self._users.move_to_end(user_id)
+            if candidates:
+                scores = np.stack([e.vector for e in candidates]) @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity_threshold:
+                    self.hits += 1
+                    return candidates[best].answer
+            self.misses += 1
+            return None
+
+    def store(self, user_id: uuid.UUID, vector, chunk_ids, answer: str) -> None:
+        """Remember ``answer`` for the query ``vector`` and its retrieved chunks."""
+        entry = CachedAnswer(
+            vector=_unit(vector),
+            chunk_ids=frozenset(chunk_ids),
+            answer=answer,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        with self._lock:
+            entries = self._users.setdefault(user_id, [])
+            entries.append(entry)
+            if len(entries) > self.max_entries_per_user:
+                del entries[0]
+                self.evictions += 1
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                _, dropped = self._users.popitem(last=False)
+                self.evictions += len(dropped)
+            self.stores += 1
+
+    def invalidate_user(self, user_id: uuid.UUID) -> None:
+        """Drop every cached answer of ``user_id``."""
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "users": len(self._users),
+            "entries": sum(len(e) for e in self._users.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+
+answer_cache = AnswerCache(
+    similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+    max_entries_per_user=settings.ANSWER_CACHE_MAX_ENTRIES_PER_USER,
+    max_users=settings.ANSWER_CACHE_MAX_USERS,
+    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+)
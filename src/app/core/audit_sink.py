@@ -0,0 +1,255 @@
+import asyncio
+import glob
+import json
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import UTC, datetime
+
+from uuid6 import uuid7
+
+from app.core.config import AuditSinkBackend, settings
+from app.core.db.database import local_session
+from app.core.logging import get_logger
+from app.repositories.audit_repo import AuditRepository
+
+logger = get_logger(__name__)
+
+
+class AuditSink(ABC):
+    """Buffer audit events in memory and write them in batches.
+
+    ``log`` never waits on storage: it appends the event to a buffer of at
+    most ``maxsize`` events and returns. A background task writes the buffer
+    every ``flush_interval`` seconds, or as soon as ``batch_size`` events are
+    waiting. Events arriving while the buffer is full are dropped and
+    counted, as are batches still failing after ``max_retries`` retries.
+    ``stop`` writes whatever is left. Until ``start`` has been called
+    (scripts, tests), ``log`` writes each event right away.
+
+    Subclasses implement ``_write``.
+    """
+
+    backend: AuditSinkBackend
+
+    def __init__(
+        self, batch_size: int, flush_interval: float, maxsize: int, max_retries: int
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.maxsize = maxsize
+        self.max_retries = max_retries
+        self._buffer: list[dict] = []
+        self._ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self.high_water = 0
+        self._flush_seconds = 0.0
+
+    async def start(self) -> None:
+        """Start the flushing task."""
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="audit-sink")
+
+    async def stop(self) -> None:
+        """Write every buffered event, then stop the flushing task."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._ready.set()
+        await self._task
+        self._task = None
+
+    async def log(self, action: str, metadata: dict, user_id: uuid.UUID | None):
+        """Record an audit event.
+
+        Args:
+            action (str): short action name (e.g. 'INGEST_SUCCESS').
+            metadata (dict): JSON-serializable metadata associated with the action.
+            user_id (uuid.UUID): user the action was performed by, if any.
+        """
+        event = {
+            "uuid": uuid7(),
+            "action": action,
+            "metadatas": metadata,
+            "user_id": user_id,
+            "created_at": datetime.now(UTC),
+        }
+        if self._task is None:
+            await self._flush([event])
+            return
+        if len(self._buffer) >= self.maxsize:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(
+                    "Audit buffer full (%d events), %d events dropped so far",
+                    self.maxsize,
+                    self.dropped,
+                )
+            return
+        self._buffer.append(event)
+        self.high_water = max(self.high_water, len(self._buffer))
+        if len(self._buffer) >= self.batch_size:
+            self._ready.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._ready.wait(), self.flush_interval)
+            except TimeoutError:
+                pass
+            self._ready.clear()
+            stopping = self._stopping
+            while self._buffer:
+                batch = self._buffer[: self.batch_size]
+                del self._buffer[: self.batch_size]
+                await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: list[dict]) -> None:
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._write(batch)
+                self.written += len(batch)
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.failed += len(batch)
+                    logger.exception(
+                        "Dropping %d audit events after %d attempts: %s",
+                        len(batch),
+                        attempt + 1,
+                        e,
+                    )
+                else:
+                    await asyncio.sleep(0.5 * 2**attempt)
+        self.flushes += 1
+        self._flush_seconds += time.perf_counter() - start
+
+    @abstractmethod
+    async def _write(self, events: list[dict]) -> None:
+        """Store ``events``, raising if they could not all be stored."""
+
+    def stats(self) -> dict:
+        """Return buffer usage, write and loss counters."""
+        return {
+            "backend": self.backend.value,
+            "buffered": len(self._buffer),
+            "maxsize": self.maxsize,
+            "high_water": self.high_water,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "avg_flush_ms": (
+                round(self._flush_seconds * 1000 / self.flushes, 1)
+                if self.flushes
+                else 0.0
+            ),
+        }
+
+
+class PostgresAuditSink(AuditSink):
+    """Write audit events to the ``audit_logs`` table, one bulk insert per batch."""
+
+    backend = AuditSinkBackend.POSTGRES
+
+    async def _write(self, events: list[dict]) -> None:
+        async with local_session() as db:
+            await AuditRepository(db).insert_many(events)
+            await db.commit()
+
+
+class FileAuditSink(AuditSink):
+    """Append audit events to zstd-compressed NDJSON files.
+
+    Each batch is appended to ``audit.ndjson.zst`` as one independent zstd
+    frame, so a crash never corrupts what was written before, and the file
+    decompresses with ``zstd -d`` as a whole. Once it reaches ``max_bytes``
+    it is renamed with a timestamp and only the newest ``backups`` rotated
+    files are kept. Requires the optional ``zstandard`` package.
+    """
+
+    backend = AuditSinkBackend.FILE
+
+    def __init__(
+        self, directory: str, max_bytes: int, backups: int, level: int, **kwargs
+    ):
+        super().__init__(**kwargs)
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError(
+                "AUDIT_SINK=file requires the 'zstandard' package"
+            ) from e
+        self._zstd = zstandard
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.level = level
+        self.path = os.path.join(directory, "audit.ndjson.zst")
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.rotations = 0
+
+    async def _write(self, events: list[dict]) -> None:
+        data = b"".join(
+            json.dumps(event, default=str).encode() + b"\n" for event in events
+        )
+        await asyncio.to_thread(self._append, data)
+
+    def _append(self, data: bytes) -> None:
+        frame = self._zstd.ZstdCompressor(level=self.level).compress(data)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(frame)
+            size = f.tell()
+        self.raw_bytes += len(data)
+        self.compressed_bytes += len(frame)
+        if size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%f")
+        os.replace(self.path, os.path.join(self.directory, f"audit-{stamp}.ndjson.zst"))
+        self.rotations += 1
+        rotated = sorted(glob.glob(os.path.join(self.directory, "audit-*.ndjson.zst")))
+        for path in rotated[: max(0, len(rotated) - self.backups)]:
+            os.remove(path)
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "raw_bytes": self.raw_bytes,
+            "compressed_bytes": self.compressed_bytes,
+            "rotations": self.rotations,
+        }
+
+
+def get_audit_sink() -> AuditSink:
+    """Build the audit sink for the configured backend."""
+    options = dict(
+        batch_size=settings.AUDIT_BATCH_SIZE,
+        flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+        maxsize=settings.AUDIT_BUFFER_SIZE,
+        max_retries=settings.AUDIT_MAX_RETRIES,
+    )
+    if settings.AUDIT_SINK == AuditSinkBackend.FILE:
+        return FileAuditSink(
+            settings.AUDIT_FILE_DIR,
+            settings.AUDIT_FILE_MAX_BYTES,
+            settings.AUDIT_FILE_BACKUPS,
+            settings.AUDIT_FILE_ZSTD_LEVEL,
+            **options,
+        )
+    return PostgresAuditSink(**options)
+
+
+audit_sink = get_audit_sink()
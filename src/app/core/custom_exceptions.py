@@ -31,3 +31,13 @@ def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse
 class DuplicateFileException(Exception):
     def __init__(self, detail: str):
         self.detail = detail
+
+
+class QueueFullException(Exception):
+    def __init__(self, detail: str):
+        self.detail = detail
+
+
+class FileVersionException(Exception):
+    def __init__(self, detail: str):
+        self.detail = detail
@@ -1,18 +1,74 @@
+import uuid
+
+import chromadb
+from chromadb.config import Settings as ChromaClientSettings
 from langchain_chroma import Chroma
+from langchain_core.embeddings import Embeddings
 
-from app.core.config import settings
+from app.core.config import ChromaShardingOption, settings
 from app.core.llm import embedding_function
 
 
-def get_vectorstore():
+def get_chroma_client() -> chromadb.ClientAPI:
+    """Create a persistent Chroma client for the configured path.
+
+    When ``CHROMA_MEMORY_LIMIT_BYTES`` is set, Chroma's LRU segment cache keeps
+    the HNSW indexes of cold collections out of memory beyond that limit.
+
+    Returns:
+        chromadb.ClientAPI: a persistent Chroma client.
+    """
+    client_settings = ChromaClientSettings(anonymized_telemetry=False)
+    if settings.CHROMA_MEMORY_LIMIT_BYTES:
+        client_settings.chroma_segment_cache_policy = "LRU"
+        client_settings.chroma_memory_limit_bytes = settings.CHROMA_MEMORY_LIMIT_BYTES
+    return chromadb.PersistentClient(
+        path=settings.CHROMA_PATH, settings=client_settings
+    )
+
+
+def collection_name_for(user_id: uuid.UUID | str | None) -> str:
+    """Return the Chroma collection that holds the chunks of ``user_id``.
+
+    Depending on ``CHROMA_SHARDING`` this is the shared collection, a
+    collection per user or one of ``CHROMA_SHARD_BUCKETS`` hash buckets.
+
+    Args:
+        user_id (uuid.UUID | str | None): owner of the documents.
+
+    Returns:
+        str: the collection name.
+    """
+    base = settings.COLLECTION_NAME
+    if user_id is None or settings.CHROMA_SHARDING == ChromaShardingOption.NONE:
+        return base
+    user_uuid = user_id if isinstance(user_id, uuid.UUID) else uuid.UUID(str(user_id))
+    if settings.CHROMA_SHARDING == ChromaShardingOption.USER:
+        return f"{base}_u_{user_uuid.hex}"
+    return f"{base}_b_{user_uuid.int % settings.CHROMA_SHARD_BUCKETS:04d}"
+
+
+def get_vectorstore(
+    embeddings: Embeddings | None = None,
+    collection_name: str | None = None,
+    client: chromadb.ClientAPI | None = None,
+):
     """Get a configured Chroma vector store instance.
 
+    Args:
+        embeddings (Embeddings | None): embeddings client to attach; a new
+            one is created from the project settings when omitted.
+        collection_name (str | None): collection to open, defaults to
+            ``COLLECTION_NAME``.
+        client (chromadb.ClientAPI | None): existing Chroma client to reuse;
+            a new one is created from the project settings when omitted.
+
     Returns:
         Chroma: a Chroma client configured with the project's settings and
         embedding function.
     """
     return Chroma(
-        persist_directory=settings.CHROMA_PATH,
-        embedding_function=embedding_function(),
-        collection_name="documents",
+        client=client or get_chroma_client(),
+        embedding_function=embeddings or embedding_function(),
+        collection_name=collection_name or settings.COLLECTION_NAME,
     )
@@ -0,0 +1,103 @@
+"""Split the shared Chroma collection into per-tenant collections.
+
+Vectors are copied as-is (no re-embedding) into the collection returned by
+``collection_name_for`` for each record's ``user_id`` metadata, using the
+sharding mode configured in ``CHROMA_SHARDING``. Run it once before switching
+a deployment from ``none`` to ``user`` or ``bucket`` sharding::
+
+    python -m app.core.db.chroma_migration --delete-source
+"""
+
+import argparse
+from collections import defaultdict
+
+from app.core.config import ChromaShardingOption, settings
+from app.core.db.chroma import collection_name_for, get_chroma_client
+from app.core.logging import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+
+def split_collection(
+    source_name: str = settings.COLLECTION_NAME,
+    batch_size: int = 1000,
+    delete_source: bool = False,
+) -> dict:
+    """Copy every record of ``source_name`` into its tenant collection.
+
+    Args:
+        source_name (str): name of the shared collection to split.
+        batch_size (int): number of records read per page.
+        delete_source (bool): drop the source collection once all records
+            were copied.
+
+    Returns:
+        dict: number of records copied per target collection and skipped
+        records without a ``user_id``.
+    """
+    if settings.CHROMA_SHARDING == ChromaShardingOption.NONE:
+        raise ValueError("Set CHROMA_SHARDING to 'user' or 'bucket' before splitting.")
+
+    client = get_chroma_client()
+    source = client.get_collection(source_name)
+    targets = {}
+    copied: dict[str, int] = defaultdict(int)
+    skipped = 0
+    offset = 0
+    total = source.count()
+    logger.info("Splitting %d records of collection %s", total, source_name)
+
+    while offset < total:
+        page = source.get(
+            limit=batch_size,
+            offset=offset,
+            include=["embeddings", "metadatas", "documents"],
+        )
+        offset += len(page["ids"])
+        if not page["ids"]:
+            break
+
+        groups: dict[str, dict[str, list]] = defaultdict(lambda: defaultdict(list))
+        for record_id, embedding, metadata, document in zip(
+            page["ids"], page["embeddings"], page["metadatas"], page["documents"]
+        ):
+            user_id = (metadata or {}).get("user_id")
+            if not user_id:
+                skipped += 1
+                continue
+            group = groups[collection_name_for(user_id)]
+            group["ids"].append(record_id)
+            group["embeddings"].append(embedding)
+            group["metadatas"].append(metadata)
+            group["documents"].append(document)
+
+        for name, group in groups.items():
+            if name not in targets:
+                targets[name] = client.get_or_create_collection(
+                    name, embedding_function=None, metadata=source.metadata
+                )
+            targets[name].upsert(**group)
+            copied[name] += len(group["ids"])
+        logger.info("Copied %d/%d records", offset, total)
+
+    if delete_source and skipped == 0:
+        client.delete_collection(source_name)
+        logger.info("Deleted source collection %s", source_name)
+    elif delete_source:
+        logger.warning(
+            "Kept source collection %s: %d records have no user_id",
+            source_name,
+            skipped,
+        )
+    return {"copied": dict(copied), "skipped": skipped}
+
+
+if __name__ == "__main__":
+    setup_logging(log_level="INFO")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=settings.COLLECTION_NAME)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--delete-source", action="store_true")
+    args = parser.parse_args()
+    result = split_collection(args.source, args.batch_size, args.delete_source)
+    logger.info("Split finished: %s", result)
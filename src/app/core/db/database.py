@@ -6,6 +6,8 @@ from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import DeclarativeBase, MappedAsDataclass
 
 from app.core.config import settings
+from app.core.db.pool import InstrumentedPool
+from app.core.db.routing import ReplicaRouter, RoutingSession
 
 convention = {
     "ix": "ix_%(column_0_label)s",
@@ -27,10 +29,47 @@ DATABASE_PREFIX = settings.POSTGRES_ASYNC_PREFIX
 DATABASE_URL = f"{DATABASE_PREFIX}{DATABASE_URI}"
 
 
-async_engine = create_async_engine(DATABASE_URL, echo=False, future=True)
+def engine_options(url: str) -> dict:
+    """Return the pool and driver options of an engine for ``url``."""
+    options = {
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+
+async_engine = create_async_engine(
+    DATABASE_URL, echo=False, future=True, **engine_options(DATABASE_URL)
+)
+
+replica_engine = (
+    create_async_engine(
+        settings.POSTGRES_READ_REPLICA_URL,
+        echo=False,
+        future=True,
+        **engine_options(settings.POSTGRES_READ_REPLICA_URL),
+    )
+    if settings.POSTGRES_READ_REPLICA_URL
+    else None
+)
+
+replica_router = ReplicaRouter(replica_engine, settings.DB_REPLICA_RETRY_INTERVAL)
 
 local_session = async_sessionmaker(
-    bind=async_engine, class_=AsyncSession, expire_on_commit=False
+    bind=async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    sync_session_class=RoutingSession,
+    router=replica_router,
 )
 
 
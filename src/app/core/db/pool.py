@@ -0,0 +1,159 @@
+import asyncio
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+import greenlet
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_DB_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _caller() -> str | None:
+    """Return ``file:line function`` of the innermost application frame.
+
+    Checkouts run inside a greenlet started by SQLAlchemy's asyncio layer,
+    whose stack ends at the greenlet; the awaiting coroutines are found on
+    the stack of the parent greenlet.
+    """
+    frame = sys._getframe(1)
+    current = greenlet.getcurrent()
+    while True:
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(_APP_DIR) and not filename.startswith(_DB_DIR):
+                location = os.path.relpath(filename, os.path.dirname(_APP_DIR))
+                return f"{location}:{frame.f_lineno} {frame.f_code.co_name}"
+            frame = frame.f_back
+        current = current.parent
+        if current is None:
+            return None
+        frame = current.gr_frame
+
+
+@dataclass
+class Checkout:
+    started: float
+    task: str | None
+    caller: str | None
+
+    def describe(self, now: float) -> dict:
+        return {
+            "held_ms": round((now - self.started) * 1000, 1),
+            "task": self.task,
+            "caller": self.caller,
+        }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` that records checkout waits and holders.
+
+    Every checkout is timed, including connecting when the pool opens a new
+    connection, and remembered with the asyncio task and application call
+    site that took it until it is returned. A checkout that finds every
+    connection, overflow included, in use logs a warning naming the
+    longest-held checkout, at most once per ``DB_POOL_EXHAUSTED_WARN_INTERVAL``
+    seconds. Counters start over when the pool is recreated.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._held: dict[int, Checkout] = {}
+        self.checkouts = 0
+        self.exhausted = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._warned_at = float("-inf")
+
+    def _is_exhausted(self) -> bool:
+        return (
+            self._max_overflow > -1
+            and self._overflow >= self._max_overflow
+            and self.checkedin() == 0
+        )
+
+    def _do_get(self):
+        start = time.perf_counter()
+        if self._is_exhausted():
+            self.exhausted += 1
+            self._warn_exhausted(start)
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        waited = time.perf_counter() - start
+        self.checkouts += 1
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        self._held[id(record)] = Checkout(
+            time.perf_counter(), task.get_name() if task else None, _caller()
+        )
+        return record
+
+    def _do_return_conn(self, record) -> None:
+        self._held.pop(id(record), None)
+        super()._do_return_conn(record)
+
+    def _warn_exhausted(self, now: float) -> None:
+        if now - self._warned_at < settings.DB_POOL_EXHAUSTED_WARN_INTERVAL:
+            return
+        self._warned_at = now
+        longest = self.longest_held(now)
+        logger.warning(
+            "DB pool exhausted (%d connections checked out, %d checkouts had to "
+            "wait so far); longest-held checkout: %s",
+            self.checkedout(),
+            self.exhausted,
+            longest,
+        )
+
+    def longest_held(self, now: float | None = None) -> dict | None:
+        """Return age, task and call site of the oldest open checkout."""
+        if not self._held:
+            return None
+        now = time.perf_counter() if now is None else now
+        oldest = min(self._held.values(), key=lambda c: c.started)
+        return oldest.describe(now)
+
+    def stats(self) -> dict:
+        """Return pool occupancy, checkout waits and the longest-held checkout."""
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "checkouts": self.checkouts,
+            "exhausted": self.exhausted,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": (
+                round(self.wait_seconds * 1000 / self.checkouts, 2)
+                if self.checkouts
+                else 0.0
+            ),
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 1),
+            "longest_held": self.longest_held(),
+        }
+
+
+async def log_pool_stats(engine, interval: float) -> None:
+    """Log the statistics of ``engine``'s pool every ``interval`` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        pool = engine.pool
+        if isinstance(pool, InstrumentedPool):
+            logger.info("DB pool: %s", pool.stats())
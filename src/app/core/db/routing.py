@@ -0,0 +1,153 @@
+import functools
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import Connection, event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Set while a ``read_only`` repository method runs.
+_read_only: ContextVar[bool] = ContextVar("db_read_only", default=False)
+# Set by the first statement of a request that may write; later reads of the
+# same request then see its writes.
+_pinned: ContextVar[bool] = ContextVar("db_pinned_to_primary", default=False)
+
+# Session.info key recording that the last read went to the replica.
+_ON_REPLICA = "on_replica"
+
+# Errors meaning the replica could not serve the read at all.
+_REPLICA_ERRORS = (
+    exc.OperationalError,
+    exc.InterfaceError,
+    exc.TimeoutError,
+    OSError,
+    TimeoutError,
+)
+
+
+class ReplicaRouter:
+    """Track an optional read replica engine and whether it is usable.
+
+    A replica that fails to serve a read is skipped for ``retry_interval``
+    seconds, during which every read goes to the primary.
+    """
+
+    def __init__(self, engine: AsyncEngine | None, retry_interval: float):
+        self.engine = engine
+        self.retry_interval = retry_interval
+        self._down_until = 0.0
+        self.reads = 0
+        self.failures = 0
+
+    def available(self) -> bool:
+        return self.engine is not None and time.monotonic() >= self._down_until
+
+    def failed(self, error: Exception) -> None:
+        self.failures += 1
+        self._down_until = time.monotonic() + self.retry_interval
+        logger.warning(
+            "Read replica failed, using the primary for %.0fs: %s",
+            self.retry_interval,
+            error,
+        )
+
+    def stats(self) -> dict:
+        """Return whether a replica is configured and usable, and its traffic."""
+        return {
+            "configured": self.engine is not None,
+            "available": self.available(),
+            "reads": self.reads,
+            "failures": self.failures,
+            "pool": self.engine.pool.stats() if self.engine is not None else None,
+        }
+
+
+class RoutingSession(Session):
+    """Session sending ``read_only`` repository reads to the read replica.
+
+    A statement goes to the replica only inside a ``read_only`` method, while
+    the replica is available, the session has no pending changes and the
+    current request has not written yet. Any other statement goes to the
+    primary and pins the rest of the request (the current asyncio context)
+    to it, so reads after a write always see that write.
+
+    Replica reads run on a connection of their own that the session joins
+    for rollbacks only: committing never touches it, and a replica failure
+    leaves the session's transaction and loaded objects as they were. The
+    connection is closed when the session's transaction ends.
+    """
+
+    def __init__(self, *args, router: ReplicaRouter | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.router = router
+        self._replica: Connection | None = None
+        self._replica_failed = False
+        if router is not None and router.engine is not None:
+            event.listen(self, "after_transaction_end", self._release_replica)
+
+    def _replica_allowed(self) -> bool:
+        return (
+            self.router is not None
+            and self.router.available()
+            and not self._replica_failed
+            and not _pinned.get()
+            and not self._flushing
+            and not (self.new or self.dirty or self.deleted)
+        )
+
+    def replica_failed(self, error: Exception) -> None:
+        """Stop reading from the replica until this transaction ends."""
+        self._replica_failed = True
+        self.router.failed(error)
+
+    def _release_replica(self, session, transaction) -> None:
+        if transaction.parent is not None:
+            return
+        self._replica_failed = False
+        if self._replica is not None:
+            replica, self._replica = self._replica, None
+            replica.close()
+
+    def get_bind(self, mapper=None, **kwargs):
+        read_only = _read_only.get()
+        if read_only and self._replica_allowed():
+            self.info[_ON_REPLICA] = True
+            self.router.reads += 1
+            if self._replica is None:
+                replica = self.router.engine.sync_engine.connect()
+                # Already in a transaction, so the session only rolls it back.
+                replica.begin()
+                self._replica = replica
+            return self._replica
+        if not read_only or self._flushing:
+            _pinned.set(True)
+        return super().get_bind(mapper, **kwargs)
+
+
+def read_only(method):
+    """Mark a repository method as a pure read the replica may serve.
+
+    If the replica cannot serve it, the replica is marked unavailable and the
+    method runs again on the primary, in the same session transaction.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        info = self.db.info
+        info.pop(_ON_REPLICA, None)
+        token = _read_only.set(True)
+        try:
+            return await method(self, *args, **kwargs)
+        except _REPLICA_ERRORS as e:
+            if not info.pop(_ON_REPLICA, False):
+                raise
+            self.db.sync_session.replica_failed(e)
+            return await method(self, *args, **kwargs)
+        finally:
+            _read_only.reset(token)
+
+    return wrapper
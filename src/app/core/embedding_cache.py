@@ -0,0 +1,185 @@
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Approximate per-entry overhead of the key and bookkeeping, in bytes.
+_ENTRY_OVERHEAD = 128
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache lookups (unicode form, whitespace and case)."""
+    return " ".join(unicodedata.normalize("NFKC", text).split()).casefold()
+
+
+class EmbeddingCache:
+    """Thread-safe LRU cache of embedding vectors with TTL expiry.
+
+    Vectors are stored as compact float32 arrays. The cache is bounded both by
+    the number of entries and by the approximate number of bytes held.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._data: OrderedDict[tuple, tuple[np.ndarray, float]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: tuple) -> np.ndarray | None:
+        """Return the cached vector for ``key`` or None on miss/expiry."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            vector, expires_at = entry
+            if expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: tuple, vector) -> None:
+        """Insert or refresh ``key`` and evict least recently used entries."""
+        array = np.asarray(vector, dtype=np.float32)
+        size = array.nbytes + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (array, time.monotonic() + self.ttl_seconds)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key: tuple) -> None:
+        vector, _ = self._data.pop(key)
+        self._bytes -= vector.nbytes + _ENTRY_OVERHEAD
+
+    def stats(self) -> dict:
+        """Return size and hit/miss/eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves repeated texts from an EmbeddingCache.
+
+    Entries are keyed by (embedding model, digest of the text). Query texts
+    are normalized first, so trivially different phrasings of a question
+    share an entry; documents are keyed on their exact text, since chunks
+    differing only in case or spacing must keep their own vectors. Queries
+    and documents use separate caches so that bulk ingestion does not evict
+    hot user queries.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model: str,
+        query_cache: EmbeddingCache,
+        document_cache: EmbeddingCache,
+    ):
+        self.embeddings = embeddings
+        self.model = model
+        self.query_cache = query_cache
+        self.document_cache = document_cache
+
+    def _key(self, text: str) -> tuple:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        return (self.model, digest)
+
+    def _query_key(self, text: str) -> tuple:
+        return self._key(normalize_text(text))
+
+    def _lookup(self, texts: list[str]):
+        keys = [self._key(t) for t in texts]
+        vectors = [self.document_cache.get(k) for k in keys]
+        # Embed each distinct missing text only once.
+        missing: dict[tuple, str] = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+        return keys, vectors, missing
+
+    def _merge(self, keys, vectors, missing, embedded) -> list[list[float]]:
+        fresh = dict(zip(missing.keys(), embedded))
+        for key, vector in fresh.items():
+            self.document_cache.put(key, vector)
+        return [
+            vector.tolist() if vector is not None else list(fresh[key])
+            for key, vector in zip(keys, vectors)
+        ]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, vectors, missing = self._lookup(texts)
+        embedded = (
+            self.embeddings.embed_documents(list(missing.values())) if missing else []
+        )
+        return self._merge(keys, vectors, missing, embedded)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys, vectors, missing = self._lookup(texts)
+        embedded = (
+            await self.embeddings.aembed_documents(list(missing.values()))
+            if missing
+            else []
+        )
+        return self._merge(keys, vectors, missing, embedded)
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._query_key(text)
+        vector = self.query_cache.get(key)
+        if vector is not None:
+            return vector.tolist()
+        result = self.embeddings.embed_query(text)
+        self.query_cache.put(key, result)
+        return result
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = self._query_key(text)
+        vector = self.query_cache.get(key)
+        if vector is not None:
+            return vector.tolist()
+        result = await self.embeddings.aembed_query(text)
+        self.query_cache.put(key, result)
+        return result
+
+    def stats(self) -> dict:
+        """Return the counters of both caches."""
+        return {
+            "model": self.model,
+            "query": self.query_cache.stats(),
+            "document": self.document_cache.stats(),
+        }
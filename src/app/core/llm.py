@@ -1,7 +1,86 @@
+import threading
+
+import httpx
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
 from app.core.config import settings
 
+_http_lock = threading.Lock()
+_http_client: httpx.Client | None = None
+_http_async_client: httpx.AsyncClient | None = None
+
+
+def _http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def _http_timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.LLM_TIMEOUT, connect=settings.LLM_CONNECT_TIMEOUT)
+
+
+def shared_http_clients() -> tuple[httpx.Client, httpx.AsyncClient]:
+    """Return the process-wide HTTP clients used for all OpenAI calls.
+
+    Both clients share the same tuned limits so that keep-alive connections and
+    TLS sessions survive across requests instead of being rebuilt per client.
+
+    Returns:
+        tuple[httpx.Client, httpx.AsyncClient]: sync and async HTTP clients.
+    """
+    global _http_client, _http_async_client
+    if _http_client is None or _http_async_client is None:
+        with _http_lock:
+            if _http_client is None:
+                _http_client = httpx.Client(
+                    limits=_http_limits(), timeout=_http_timeout()
+                )
+            if _http_async_client is None:
+                _http_async_client = httpx.AsyncClient(
+                    limits=_http_limits(), timeout=_http_timeout()
+                )
+    return _http_client, _http_async_client
+
+
+async def close_http_clients() -> None:
+    """Close the shared HTTP clients and their connection pools."""
+    global _http_client, _http_async_client
+    with _http_lock:
+        client, async_client = _http_client, _http_async_client
+        _http_client = _http_async_client = None
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        await async_client.aclose()
+
+
+def _pool_stats(client: httpx.Client | httpx.AsyncClient | None) -> dict:
+    # httpx has no public pool statistics; read httpcore's pool when it is
+    # there and report nothing when a transport or version lacks it.
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if connections is None:
+        return {}
+    try:
+        idle = sum(1 for c in connections if c.is_idle())
+    except AttributeError:
+        return {}
+    return {"connections": len(connections), "idle": idle}
+
+
+def http_pool_stats() -> dict:
+    """Return the configured limits and current usage of the shared pools."""
+    return {
+        "max_connections": settings.LLM_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        "keepalive_expiry": settings.LLM_KEEPALIVE_EXPIRY,
+        "sync": _pool_stats(_http_client),
+        "async": _pool_stats(_http_async_client),
+    }
+
 
 def openai_llm(
     model_name: str = settings.LLM_MODEL,
@@ -18,11 +97,14 @@ def openai_llm(
     Returns:
         ChatOpenAI: configured LLM client.
     """
+    http_client, http_async_client = shared_http_clients()
     return ChatOpenAI(
         model=model_name,
         temperature=temperature,
         streaming=streaming,
         api_key=settings.LLM_API_KEY,
+        http_client=http_client,
+        http_async_client=http_async_client,
     )
 
 
@@ -35,4 +117,10 @@ def embedding_function(model_name: str = settings.EMBEDDING_MODEL) -> OpenAIEmbe
     Returns:
         OpenAIEmbeddings: embeddings client.
     """
-    return OpenAIEmbeddings(api_key=settings.LLM_API_KEY, model=model_name)
+    http_client, http_async_client = shared_http_clients()
+    return OpenAIEmbeddings(
+        api_key=settings.LLM_API_KEY,
+        model=model_name,
+        http_client=http_client,
+        http_async_client=http_async_client,
+    )
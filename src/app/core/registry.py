@@ -0,0 +1,204 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.core.config import ChromaShardingOption, settings
+from app.core.db.chroma import collection_name_for, get_chroma_client, get_vectorstore
+from app.core.embedding_cache import CachedEmbeddings, EmbeddingCache
+from app.core.llm import embedding_function
+from app.core.logging import get_logger
+from app.utils.file_loader import prime_parse_worker
+
+logger = get_logger(__name__)
+
+
+class ClientRegistry:
+    """Process-wide holder for long-lived vector store and embedding clients.
+
+    Objects are created once per worker process (normally during the FastAPI
+    lifespan warmup) and shared by every request. Creation is guarded by a
+    lock so concurrent first use from threads never builds duplicates.
+
+    Vector stores are opened per Chroma collection (see
+    ``collection_name_for``) and kept in an LRU of at most
+    ``CHROMA_MAX_OPEN_COLLECTIONS`` entries. Evicting one only drops the
+    wrapper, which is rebuilt on next use; Chroma has no per-collection close,
+    and the memory of cold collections' indexes is bounded by the client's
+    segment cache (``CHROMA_MEMORY_LIMIT_BYTES``).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._embeddings = None
+        self._chroma_client = None
+        self._vectorstores: OrderedDict[str, object] = OrderedDict()
+        self._search_executor = None
+        self._parse_executor = None
+        self._created = {
+            "embeddings": 0,
+            "chroma_client": 0,
+            "vectorstore": 0,
+            "search_executor": 0,
+            "parse_executor": 0,
+        }
+        self.evicted_vectorstores = 0
+        self.warmup_seconds: float | None = None
+
+    @staticmethod
+    def _build_embeddings():
+        embeddings = embedding_function()
+        if not settings.EMBEDDING_CACHE_ENABLED:
+            return embeddings
+        return CachedEmbeddings(
+            embeddings,
+            model=settings.EMBEDDING_MODEL,
+            query_cache=EmbeddingCache(
+                settings.EMBEDDING_CACHE_MAX_ENTRIES,
+                settings.EMBEDDING_CACHE_MAX_BYTES,
+                settings.EMBEDDING_CACHE_TTL_SECONDS,
+            ),
+            document_cache=EmbeddingCache(
+                settings.EMBEDDING_CACHE_MAX_ENTRIES,
+                settings.EMBEDDING_CACHE_MAX_BYTES,
+                settings.EMBEDDING_CACHE_TTL_SECONDS,
+            ),
+        )
+
+    def embeddings(self):
+        """Return the shared embeddings client, creating it on first use."""
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    self._embeddings = self._build_embeddings()
+                    self._created["embeddings"] += 1
+        return self._embeddings
+
+    def chroma_client(self):
+        """Return the shared persistent Chroma client."""
+        if self._chroma_client is None:
+            with self._lock:
+                if self._chroma_client is None:
+                    self._chroma_client = get_chroma_client()
+                    self._created["chroma_client"] += 1
+        return self._chroma_client
+
+    def vectorstore(self, user_id: uuid.UUID | None = None):
+        """Return the shared Chroma vector store holding ``user_id``'s chunks.
+
+        Args:
+            user_id (uuid.UUID | None): owner of the documents; the default
+                collection is returned when omitted.
+        """
+        name = collection_name_for(user_id)
+        with self._lock:
+            vectorstore = self._vectorstores.get(name)
+            if vectorstore is not None:
+                self._vectorstores.move_to_end(name)
+                return vectorstore
+            vectorstore = get_vectorstore(
+                self.embeddings(), collection_name=name, client=self.chroma_client()
+            )
+            self._vectorstores[name] = vectorstore
+            self._created["vectorstore"] += 1
+            while len(self._vectorstores) > settings.CHROMA_MAX_OPEN_COLLECTIONS:
+                self._vectorstores.popitem(last=False)
+                self.evicted_vectorstores += 1
+        return vectorstore
+
+    def search_executor(self) -> ThreadPoolExecutor:
+        """Return the dedicated executor for blocking vector store queries."""
+        if self._search_executor is None:
+            with self._lock:
+                if self._search_executor is None:
+                    self._search_executor = ThreadPoolExecutor(
+                        max_workers=settings.RETRIEVAL_SEARCH_WORKERS,
+                        thread_name_prefix="chroma-search",
+                    )
+                    self._created["search_executor"] += 1
+        return self._search_executor
+
+    def parse_executor(self) -> ProcessPoolExecutor:
+        """Return the process pool that runs CPU-bound document parsing.
+
+        Worker processes are spawned rather than forked, so they never
+        inherit the locks or threads of the vector store clients.
+        """
+        if self._parse_executor is None:
+            with self._lock:
+                if self._parse_executor is None:
+                    self._parse_executor = ProcessPoolExecutor(
+                        max_workers=settings.INGEST_PARSE_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                    self._created["parse_executor"] += 1
+        return self._parse_executor
+
+    def reset_parse_executor(self) -> None:
+        """Drop a broken parse pool so the next call starts a fresh one."""
+        with self._lock:
+            if self._parse_executor is not None:
+                self._parse_executor.shutdown(wait=False, cancel_futures=True)
+                self._parse_executor = None
+
+    def warmup(self) -> float:
+        """Eagerly create all shared clients.
+
+        Returns:
+            float: seconds spent creating the clients.
+        """
+        start = time.perf_counter()
+        self.embeddings()
+        self.chroma_client()
+        if settings.CHROMA_SHARDING == ChromaShardingOption.NONE:
+            self.vectorstore()
+        self.search_executor()
+        # Start the parse workers in the background; spawned processes need a
+        # few seconds to import the loaders and should not delay startup.
+        parse_executor = self.parse_executor()
+        for _ in range(settings.INGEST_PARSE_WORKERS):
+            parse_executor.submit(prime_parse_worker)
+        self.warmup_seconds = time.perf_counter() - start
+        logger.info(
+            "Client registry warmed up in %.3fs: %s",
+            self.warmup_seconds,
+            self._created,
+        )
+        return self.warmup_seconds
+
+    def close(self) -> None:
+        """Drop the shared clients so they can be garbage collected."""
+        with self._lock:
+            if self._search_executor is not None:
+                self._search_executor.shutdown(wait=False, cancel_futures=True)
+                self._search_executor = None
+            if self._parse_executor is not None:
+                self._parse_executor.shutdown(wait=False, cancel_futures=True)
+                self._parse_executor = None
+            self._vectorstores.clear()
+            self._chroma_client = None
+            self._embeddings = None
+
+    def stats(self) -> dict:
+        """Return warmup timing, object counts and embedding cache counters."""
+        embeddings = self._embeddings
+        return {
+            "warmup_seconds": self.warmup_seconds,
+            "embedding_cache": (
+                embeddings.stats() if isinstance(embeddings, CachedEmbeddings) else None
+            ),
+            "created": dict(self._created),
+            "evicted_vectorstores": self.evicted_vectorstores,
+            "live": {
+                "embeddings": int(self._embeddings is not None),
+                "chroma_client": int(self._chroma_client is not None),
+                "vectorstore": len(self._vectorstores),
+                "search_executor": int(self._search_executor is not None),
+                "parse_executor": int(self._parse_executor is not None),
+            },
+        }
+
+
+registry = ClientRegistry()
@@ -0,0 +1,174 @@
+import asyncio
+import time
+import uuid
+from collections import defaultdict
+
+from sqlalchemy import inspect
+
+from app.core.config import settings
+from app.core.db.database import local_session
+from app.core.logging import get_logger
+from app.models.chat import ChatMessage
+from app.repositories.bulk import bulk_insert
+
+logger = get_logger(__name__)
+
+# Queued after the last row by ``stop``.
+_STOP = object()
+
+
+def _row(obj) -> dict:
+    """Return the column values of a mapped instance, keyed by column name."""
+    return {
+        prop.columns[0].key: getattr(obj, prop.key)
+        for prop in inspect(type(obj)).column_attrs
+    }
+
+
+class WriteBehindPersister:
+    """Persist append-only rows (chat messages) off the request.
+
+    ``add`` only queues the row; a background task writes queued rows in
+    multi-row inserts, one transaction per flush, once ``batch_size`` rows
+    are waiting or ``flush_interval`` seconds after the first of them. The
+    queue is bounded: when the database falls behind by ``maxsize`` rows,
+    ``add`` waits for room. ``stop`` flushes everything still queued.
+
+    Chat messages stay readable through ``pending_messages`` until their
+    flush has committed, so history never misses a message in flight. Until
+    ``start`` has been called (scripts, tests), ``add`` writes right away.
+    """
+
+    def __init__(
+        self, batch_size: int, flush_interval: float, maxsize: int, max_retries: int
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.maxsize = maxsize
+        self.max_retries = max_retries
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._pending: dict[uuid.UUID, dict[uuid.UUID, ChatMessage]] = defaultdict(dict)
+        self.flushes = 0
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._flush_seconds = 0.0
+
+    async def start(self) -> None:
+        """Start the flushing task."""
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._task = asyncio.create_task(self._run(), name="write-behind")
+
+    async def stop(self) -> None:
+        """Flush every queued row, then stop the flushing task."""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    async def add(self, obj) -> None:
+        """Queue a new row, such as a ``ChatMessage``, for insertion.
+
+        The row must have all its values set; rows are inserted as they are
+        and never updated.
+        """
+        if isinstance(obj, ChatMessage):
+            self._pending[obj.conversation_id][obj.uuid] = obj
+        if self._queue is None:
+            await self._flush([obj])
+            return
+        await self._queue.put(obj)
+
+    def pending_messages(self, conversation_id: uuid.UUID) -> list[ChatMessage]:
+        """Return the messages of a conversation not committed yet."""
+        return list(self._pending.get(conversation_id, {}).values())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = await asyncio.wait_for(
+                        self._queue.get(), max(0.0, deadline - loop.time())
+                    )
+                except TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list) -> None:
+        start = time.perf_counter()
+        try:
+            rows = defaultdict(list)
+            for obj in batch:
+                rows[type(obj)].append(_row(obj))
+            for attempt in range(self.max_retries + 1):
+                try:
+                    async with local_session() as db:
+                        for model, model_rows in rows.items():
+                            await bulk_insert(db, model, model_rows)
+                        await db.commit()
+                    self.rows_written += len(batch)
+                    break
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        self.rows_failed += len(batch)
+                        logger.exception(
+                            "Dropping %d write-behind rows: %s", len(batch), e
+                        )
+                    else:
+                        await asyncio.sleep(0.5 * 2**attempt)
+        finally:
+            for obj in batch:
+                if isinstance(obj, ChatMessage):
+                    messages = self._pending.get(obj.conversation_id)
+                    if messages is not None:
+                        messages.pop(obj.uuid, None)
+                        if not messages:
+                            del self._pending[obj.conversation_id]
+        seconds = time.perf_counter() - start
+        self.flushes += 1
+        self._flush_seconds += seconds
+        self.last_flush_ms = seconds * 1000
+        self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+        logger.debug(
+            "Flushed %d write-behind rows in %.1fms", len(batch), seconds * 1000
+        )
+
+    def stats(self) -> dict:
+        """Return queue depth, write counts and flush latency."""
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "maxsize": self.maxsize,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "rows_failed": self.rows_failed,
+            "last_flush_ms": round(self.last_flush_ms, 1),
+            "avg_flush_ms": (
+                round(self._flush_seconds * 1000 / self.flushes, 1)
+                if self.flushes
+                else 0.0
+            ),
+            "max_flush_ms": round(self.max_flush_ms, 1),
+        }
+
+
+write_behind = WriteBehindPersister(
+    batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+    flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL,
+    maxsize=settings.WRITE_BEHIND_QUEUE_SIZE,
+    max_retries=settings.WRITE_BEHIND_MAX_RETRIES,
+)
@@ -1,19 +1,56 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.exceptions import HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.apis.v1 import auth, chat, health, ingest
+from app.apis.v1 import auth, chat, health, ingest, internal
+from app.core.audit_sink import audit_sink
 from app.core.config import settings
 from app.core.custom_exceptions import http_exception_handler
+from app.core.db.database import async_engine
+from app.core.db.pool import log_pool_stats
+from app.core.llm import close_http_clients
 from app.core.logging import setup_logging
+from app.core.registry import registry
+from app.core.write_behind import write_behind
+from app.services.job_queue import job_queue
+from app.utils.chains import chain_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the shared clients once per worker and release them on shutdown."""
+    await asyncio.to_thread(registry.warmup)
+    await asyncio.to_thread(chain_pool.get)
+    await write_behind.start()
+    await audit_sink.start()
+    await job_queue.start()
+    pool_stats_logger = None
+    if settings.DB_POOL_STATS_LOG_INTERVAL > 0:
+        pool_stats_logger = asyncio.create_task(
+            log_pool_stats(async_engine, settings.DB_POOL_STATS_LOG_INTERVAL)
+        )
+    yield
+    if pool_stats_logger is not None:
+        pool_stats_logger.cancel()
+        await asyncio.gather(pool_stats_logger, return_exceptions=True)
+    await job_queue.stop()
+    await write_behind.stop()
+    await audit_sink.stop()
+    chain_pool.clear()
+    registry.close()
+    await close_http_clients()
+
 
 # Base.metadata.create_all(bind=async_engine)
 # TODO read from config
 app = FastAPI(
     title=settings.APP_NAME or "RAG ChatBot",
     description=settings.APP_DESCRIPTION,
+    lifespan=lifespan,
 )
 setup_logging(log_level="INFO")
 
@@ -34,5 +71,6 @@ os.environ["LANGCHAIN_ENDPOINT"] = settings.LANGSMITH_ENDPOINT
 app.include_router(health.router, prefix="/api/v1")
 app.include_router(ingest.router, prefix="/api/v1")
 app.include_router(chat.router, prefix="/api/v1")
+app.include_router(internal.router, prefix="/api/v1")
 app.include_router(auth.router)
 app.add_exception_handler(HTTPException, http_exception_handler)
@@ -1,12 +1,19 @@
 from app.models.audit import AuditLog
 from app.models.chat import ChatMessage, Conversation
-from app.models.chunking import DocumentChunk
+from app.models.chunk_embedding import ChunkEmbedding
+from app.models.chunking import ChunkMinHashBand, DocumentChunk
 from app.models.file_metadata import FileMetadata
+from app.models.ingest_checkpoint import IngestCheckpoint
+from app.models.ingest_job import IngestJob
 from app.models.user import User
 
 __all__ = [
     "FileMetadata",
+    "IngestJob",
+    "IngestCheckpoint",
     "DocumentChunk",
+    "ChunkEmbedding",
+    "ChunkMinHashBand",
     "Conversation",
     "ChatMessage",
     "AuditLog",
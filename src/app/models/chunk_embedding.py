@@ -0,0 +1,23 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import TIMESTAMP, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.core.db.database import Base
+
+
+class ChunkEmbedding(Base):
+    __tablename__ = "chunk_embeddings"
+
+    # SHA256 of the embedding model and the exact chunk text.
+    content_hash: Mapped[str] = mapped_column(String, primary_key=True)
+    model: Mapped[str] = mapped_column(String)
+    dimensions: Mapped[int] = mapped_column(Integer)
+    # float32 vector, little-endian.
+    vector: Mapped[bytes] = mapped_column(LargeBinary)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        default_factory=lambda: datetime.now(UTC),
+    )
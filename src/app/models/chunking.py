@@ -1,6 +1,6 @@
 import uuid as uuid_pkg
 
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import BigInteger, ForeignKey, Index, Integer, LargeBinary, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 from uuid6 import uuid7
@@ -11,7 +11,9 @@ from app.core.db.database import Base
 class DocumentChunk(Base):
     __tablename__ = "chunks"
 
-    file_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("files.id"))
+    file_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("files.id"), index=True
+    )
     chunk_index: Mapped[int] = mapped_column(Integer)
     chroma_id: Mapped[str] = mapped_column(String)
     id: Mapped[UUID] = mapped_column(
@@ -20,3 +22,28 @@ class DocumentChunk(Base):
     user_id: Mapped[uuid_pkg.UUID] = mapped_column(
         ForeignKey("user.uuid"), default=None, nullable=True
     )
+    # Key of the chunk text in chunk_embeddings, used to align file versions.
+    content_hash: Mapped[str | None] = mapped_column(
+        String, nullable=True, default=None
+    )
+    # uint32 MinHash signature of the chunk text, see app.utils.minhash.
+    minhash: Mapped[bytes | None] = mapped_column(
+        LargeBinary, nullable=True, default=None
+    )
+
+
+class ChunkMinHashBand(Base):
+    """LSH band key of a chunk's MinHash, for near-duplicate lookups."""
+
+    __tablename__ = "chunk_minhash_bands"
+    __table_args__ = (
+        Index("ix_chunk_minhash_bands_user_id_band_key", "user_id", "band_key"),
+    )
+
+    chunk_id: Mapped[uuid_pkg.UUID] = mapped_column(
+        ForeignKey("chunks.id", ondelete="CASCADE"), primary_key=True
+    )
+    band_key: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    user_id: Mapped[uuid_pkg.UUID] = mapped_column(
+        ForeignKey("user.uuid"), default=None, nullable=True
+    )
@@ -2,7 +2,7 @@ import uuid
 import uuid as uuid_pkg
 from datetime import UTC, datetime
 
-from sqlalchemy import TIMESTAMP, ForeignKey, String, UniqueConstraint
+from sqlalchemy import TIMESTAMP, ForeignKey, Index, Integer, String, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
@@ -12,8 +12,17 @@ from app.core.db.database import Base
 
 class FileMetadata(Base):
     __tablename__ = "files"
-    _table_args__ = (
-        UniqueConstraint("file_hash", "user_id", name="uq_file_hash_user_id"),
+    # A hash is unique per user among live versions only, so content that was
+    # superseded can be uploaded again (e.g. to revert to it).
+    __table_args__ = (
+        Index(
+            "uq_file_hash_user_id",
+            "file_hash",
+            "user_id",
+            unique=True,
+            postgresql_where=text("status != 'superseded'"),
+            sqlite_where=text("status != 'superseded'"),
+        ),
     )
 
     filename: Mapped[str] = mapped_column(String, nullable=False)
@@ -30,3 +39,15 @@ class FileMetadata(Base):
     user_id: Mapped[uuid_pkg.UUID] = mapped_column(
         ForeignKey("user.uuid"), default=None, nullable=True
     )
+    # Last change of the row, status changes included.
+    updated_at: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=True,
+        default=None,
+        onupdate=lambda: datetime.now(UTC),
+    )
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
+    # The file this version replaced; it is "superseded" once this one is in.
+    previous_version_id: Mapped[uuid_pkg.UUID | None] = mapped_column(
+        ForeignKey("files.id"), default=None, nullable=True
+    )
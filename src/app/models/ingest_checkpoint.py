@@ -0,0 +1,27 @@
+import uuid as uuid_pkg
+from datetime import UTC, datetime
+
+from sqlalchemy import TIMESTAMP, ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.core.db.database import Base
+
+
+class IngestCheckpoint(Base):
+    __tablename__ = "ingest_checkpoints"
+
+    file_id: Mapped[uuid_pkg.UUID] = mapped_column(
+        ForeignKey("files.id"), primary_key=True
+    )
+    # Position of the embedding batch within the file, from 0.
+    batch_number: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # SHA256 of the batch's chunk content hashes, to detect a different split.
+    batch_hash: Mapped[str] = mapped_column(String)
+    start_index: Mapped[int] = mapped_column(Integer)
+    chunk_count: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        default_factory=lambda: datetime.now(UTC),
+    )
@@ -0,0 +1,49 @@
+import uuid as uuid_pkg
+from datetime import UTC, datetime
+
+from sqlalchemy import JSON, TIMESTAMP, BigInteger, Float, ForeignKey, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from uuid6 import uuid7
+
+from app.core.db.database import Base
+
+
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+
+    filename: Mapped[str] = mapped_column(String)
+    spool_path: Mapped[str] = mapped_column(String)
+    file_hash: Mapped[str | None] = mapped_column(String, nullable=True, default=None)
+    size_bytes: Mapped[int | None] = mapped_column(
+        BigInteger, nullable=True, default=None
+    )
+    id: Mapped[uuid_pkg.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default_factory=uuid7
+    )
+    user_id: Mapped[uuid_pkg.UUID] = mapped_column(
+        ForeignKey("user.uuid"), index=True, nullable=True, default=None
+    )
+    status: Mapped[str] = mapped_column(String, default="queued")
+    stage: Mapped[str | None] = mapped_column(String, nullable=True, default=None)
+    progress: Mapped[float] = mapped_column(Float, default=0.0)
+    file_id: Mapped[uuid_pkg.UUID | None] = mapped_column(
+        ForeignKey("files.id"), nullable=True, default=None
+    )
+    replaces_file_id: Mapped[uuid_pkg.UUID | None] = mapped_column(
+        ForeignKey("files.id"), nullable=True, default=None
+    )
+    error: Mapped[str | None] = mapped_column(Text, nullable=True, default=None)
+    timings: Mapped[dict] = mapped_column(JSON, default_factory=dict)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        default_factory=lambda: datetime.now(UTC),
+    )
+    started_at: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True, default=None
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True, default=None
+    )
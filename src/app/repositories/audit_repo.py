@@ -3,6 +3,7 @@ import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.audit import AuditLog
+from app.repositories.bulk import bulk_insert
 
 
 class AuditRepository:
@@ -20,6 +21,15 @@ class AuditRepository:
         Args:
             action (str): short action name (e.g. 'INGEST_SUCCESS').
             metadata (dict): JSON-serializable metadata associated with the action.
+            user_id (uuid.UUID): user the action was performed by, if any.
         """
-        self.db.add(AuditLog(action=action, metadatas=metadata))
+        self.db.add(AuditLog(action=action, metadatas=metadata, user_id=user_id))
         await self.db.commit()
+
+    async def insert_many(self, rows: list[dict]) -> None:
+        """Insert audit log rows in bulk, without committing.
+
+        Args:
+            rows (List[dict]): complete ``audit_logs`` rows, primary keys included.
+        """
+        await bulk_insert(self.db, AuditLog, rows)
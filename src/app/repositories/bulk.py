@@ -0,0 +1,114 @@
+import json
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class BulkWriteStats:
+    rows: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    copied: bool = False
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def add(self, other: "BulkWriteStats") -> None:
+        self.rows += other.rows
+        self.batches += other.batches
+        self.seconds += other.seconds
+        self.copied = self.copied or other.copied
+
+    def summary(self) -> dict:
+        return {
+            "rows": self.rows,
+            "batches": self.batches,
+            "ms": round(self.seconds * 1000, 1),
+            "rows_per_sec": round(self.rows_per_second),
+            "copy": self.copied,
+        }
+
+
+async def bulk_insert(
+    db: AsyncSession,
+    model,
+    rows: list[dict],
+    batch_size: int = settings.DB_BULK_BATCH_SIZE,
+    use_copy: bool = settings.DB_BULK_USE_COPY,
+    ignore_conflicts: bool = False,
+) -> BulkWriteStats:
+    """Insert plain row dicts with Core, bypassing the ORM unit of work.
+
+    On asyncpg, rows are streamed with ``COPY`` on the session's connection;
+    otherwise each batch is one executemany ``INSERT``. Rows must carry every
+    column, primary keys included, since no Python-side defaults are applied.
+    The rows join the session's transaction; the caller commits.
+
+    Args:
+        db (AsyncSession): session whose transaction the rows are written in.
+        model: mapped class of the target table.
+        rows (List[dict]): column values of each row, all with the same keys.
+        batch_size (int): rows sent per statement or ``COPY``.
+        use_copy (bool): use ``COPY`` when the driver supports it.
+        ignore_conflicts (bool): skip rows whose key already exists; this
+            needs ``INSERT ... ON CONFLICT`` and so never uses ``COPY``.
+
+    Returns:
+        BulkWriteStats: rows, batches and time spent.
+    """
+    stats = BulkWriteStats()
+    if not rows:
+        return stats
+    table = model.__table__
+    start = time.perf_counter()
+    conn = await db.connection()
+    if use_copy and not ignore_conflicts and conn.dialect.driver == "asyncpg":
+        columns = list(rows[0])
+        # COPY skips SQLAlchemy's type processing; asyncpg takes JSON as text.
+        encode = [
+            json.dumps if isinstance(table.c[c].type, JSON) else None for c in columns
+        ]
+        raw = (await conn.get_raw_connection()).driver_connection
+        for offset in range(0, len(rows), batch_size):
+            await raw.copy_records_to_table(
+                table.name,
+                records=[
+                    tuple(
+                        row[c] if e is None or row[c] is None else e(row[c])
+                        for c, e in zip(columns, encode)
+                    )
+                    for row in rows[offset : offset + batch_size]
+                ],
+                columns=columns,
+                schema_name=table.schema,
+            )
+            stats.batches += 1
+        stats.copied = True
+    else:
+        stmt = insert(table)
+        if ignore_conflicts:
+            stmt = stmt.on_conflict_do_nothing()
+        for offset in range(0, len(rows), batch_size):
+            await conn.execute(stmt, rows[offset : offset + batch_size])
+            stats.batches += 1
+    stats.rows = len(rows)
+    stats.seconds = time.perf_counter() - start
+    logger.debug(
+        "Inserted %d %s rows in %d batches: %.1fms, %.0f rows/s",
+        stats.rows,
+        table.name,
+        stats.batches,
+        stats.seconds * 1000,
+        stats.rows_per_second,
+    )
+    return stats
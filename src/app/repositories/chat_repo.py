@@ -3,6 +3,7 @@ import uuid
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.db.routing import read_only
 from app.models.chat import ChatMessage, Conversation
 
 
@@ -25,6 +26,7 @@ class ChatRepository:
         await self.db.commit()
         return conversation.uuid
 
+    @read_only
     async def get_conversation(self, conversation_id):
         """Retrieve conversations matching the provided UUID.
 
@@ -48,18 +50,20 @@ class ChatRepository:
         self.db.add(message)
         await self.db.commit()
 
-    async def get_history(self, conversation_id):
+    @read_only
+    async def get_history(self, conversation_id, exclude_id: uuid.UUID | None = None):
         """Retrieve chronological chat history for a conversation.
 
         Args:
             conversation_id: UUID of the conversation.
+            exclude_id (uuid.UUID | None): optional message UUID to leave out,
+                e.g. the current user message being written concurrently.
 
         Returns:
             List[ChatMessage]: ordered list of messages.
         """
-        result = await self.db.execute(
-            select(ChatMessage)
-            .where(ChatMessage.conversation_id == conversation_id)
-            .order_by(ChatMessage.created_at.asc())
-        )
+        stmt = select(ChatMessage).where(ChatMessage.conversation_id == conversation_id)
+        if exclude_id is not None:
+            stmt = stmt.where(ChatMessage.uuid != exclude_id)
+        result = await self.db.execute(stmt.order_by(ChatMessage.created_at.asc()))
         return result.scalars().all()
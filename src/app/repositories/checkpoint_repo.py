@@ -0,0 +1,63 @@
+import uuid
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ingest_checkpoint import IngestCheckpoint
+
+
+class CheckpointRepository:
+    def __init__(self, db: AsyncSession):
+        """Repository for IngestCheckpoint persistence.
+
+        Args:
+            db: an AsyncSession used for DB operations.
+        """
+        self.db = db
+
+    async def save(self, checkpoint: IngestCheckpoint) -> IngestCheckpoint:
+        """Persist a checkpoint, committing the batch it belongs to.
+
+        Args:
+            checkpoint (IngestCheckpoint): the completed batch.
+
+        Returns:
+            IngestCheckpoint: the saved checkpoint.
+        """
+        self.db.add(checkpoint)
+        await self.db.commit()
+        return checkpoint
+
+    async def get_for_file(self, file_id: uuid.UUID) -> dict[int, str]:
+        """Return the batch hash of every committed batch of a file.
+
+        Args:
+            file_id (uuid.UUID): the file whose checkpoints are listed.
+
+        Returns:
+            dict[int, str]: batch hashes keyed by batch number.
+        """
+        stmt = select(IngestCheckpoint.batch_number, IngestCheckpoint.batch_hash).where(
+            IngestCheckpoint.file_id == file_id
+        )
+        return dict((await self.db.execute(stmt)).all())
+
+    async def delete_for_file(
+        self, file_id: uuid.UUID, from_batch: int = 0, commit: bool = True
+    ):
+        """Delete the checkpoints of a file from ``from_batch`` on.
+
+        Args:
+            file_id (uuid.UUID): the file whose checkpoints are removed.
+            from_batch (int): first batch number to remove.
+            commit (bool): commit right away; pass False to make the delete
+                part of a larger transaction.
+        """
+        await self.db.execute(
+            delete(IngestCheckpoint).where(
+                IngestCheckpoint.file_id == file_id,
+                IngestCheckpoint.batch_number >= from_batch,
+            )
+        )
+        if commit:
+            await self.db.commit()
@@ -0,0 +1,57 @@
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.chunk_embedding import ChunkEmbedding
+from app.repositories.bulk import bulk_insert
+
+# Keeps IN lists well below driver parameter limits.
+BULK_SIZE = 1000
+
+
+class ChunkEmbeddingRepository:
+    def __init__(self, db: AsyncSession):
+        """Repository for the content-addressed chunk embedding store.
+
+        Args:
+            db: an AsyncSession used for DB operations.
+        """
+        self.db = db
+
+    async def get_many(self, content_hashes: list[str]) -> dict[str, list[float]]:
+        """Fetch the stored vectors of ``content_hashes`` in bulk.
+
+        Args:
+            content_hashes (List[str]): keys to look up; duplicates are fine.
+
+        Returns:
+            dict[str, List[float]]: vectors of the keys that were found.
+        """
+        keys = list(dict.fromkeys(content_hashes))
+        found = {}
+        for start in range(0, len(keys), BULK_SIZE):
+            stmt = select(ChunkEmbedding.content_hash, ChunkEmbedding.vector).where(
+                ChunkEmbedding.content_hash.in_(keys[start : start + BULK_SIZE])
+            )
+            for content_hash, vector in await self.db.execute(stmt):
+                found[content_hash] = np.frombuffer(vector, dtype="<f4").tolist()
+        return found
+
+    async def save_many(self, model: str, vectors: dict[str, list[float]]):
+        """Store new vectors, keeping any row that already exists.
+
+        Args:
+            model (str): embedding model that produced the vectors.
+            vectors (dict[str, List[float]]): vectors keyed by content hash.
+        """
+        rows = [
+            {
+                "content_hash": content_hash,
+                "model": model,
+                "dimensions": len(vector),
+                "vector": np.asarray(vector, dtype="<f4").tobytes(),
+            }
+            for content_hash, vector in vectors.items()
+        ]
+        await bulk_insert(self.db, ChunkEmbedding, rows, ignore_conflicts=True)
+        await self.db.commit()
@@ -1,5 +1,14 @@
+import uuid
+
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.chunking import ChunkMinHashBand, DocumentChunk
+from app.repositories.bulk import BulkWriteStats, bulk_insert
+
+# Keeps IN lists well below driver parameter limits.
+BULK_SIZE = 1000
+
 
 class ChunkRepository:
     def __init__(self, db: AsyncSession):
@@ -10,11 +19,92 @@ class ChunkRepository:
         """
         self.db = db
 
-    async def save_all(self, chunks):
-        """Persist multiple chunk records in a single transaction.
+    async def insert_many(
+        self, chunks: list[dict], bands: list[dict]
+    ) -> BulkWriteStats:
+        """Bulk insert chunk rows and their MinHash bands without committing.
+
+        Args:
+            chunks (List[dict]): DocumentChunk column values, ids included.
+            bands (List[dict]): ChunkMinHashBand column values.
+
+        Returns:
+            BulkWriteStats: combined write statistics of both tables.
+        """
+        stats = await bulk_insert(self.db, DocumentChunk, chunks)
+        stats.add(await bulk_insert(self.db, ChunkMinHashBand, bands))
+        return stats
+
+    async def find_by_band_keys(
+        self,
+        user_id: uuid.UUID,
+        band_keys: list[int],
+        exclude_file_ids: list[uuid.UUID] | None = None,
+    ) -> list[tuple[int, uuid.UUID, bytes]]:
+        """Find a user's chunks sharing a MinHash LSH band key.
+
+        Args:
+            user_id (uuid.UUID): owner of the chunks to search.
+            band_keys (List[int]): band keys to match.
+            exclude_file_ids (List[uuid.UUID]): files whose chunks are skipped.
+
+        Returns:
+            List[tuple[int, uuid.UUID, bytes]]: matching band key, chunk id and
+            MinHash signature, one row per matching band.
+        """
+        keys = list(set(band_keys))
+        rows = []
+        for start in range(0, len(keys), BULK_SIZE):
+            stmt = (
+                select(
+                    ChunkMinHashBand.band_key, DocumentChunk.id, DocumentChunk.minhash
+                )
+                .join(DocumentChunk, DocumentChunk.id == ChunkMinHashBand.chunk_id)
+                .where(
+                    ChunkMinHashBand.user_id == user_id,
+                    ChunkMinHashBand.band_key.in_(keys[start : start + BULK_SIZE]),
+                )
+            )
+            if exclude_file_ids:
+                stmt = stmt.where(DocumentChunk.file_id.not_in(exclude_file_ids))
+            rows.extend((await self.db.execute(stmt)).all())
+        return rows
+
+    async def get_for_file(self, file_id: uuid.UUID) -> list[tuple[str, str | None]]:
+        """Return the Chroma id and content hash of every chunk of a file.
+
+        Args:
+            file_id (uuid.UUID): the file whose chunks are listed.
+
+        Returns:
+            List[tuple[str, Optional[str]]]: chunks in chunk_index order.
+        """
+        stmt = (
+            select(DocumentChunk.chroma_id, DocumentChunk.content_hash)
+            .where(DocumentChunk.file_id == file_id)
+            .order_by(DocumentChunk.chunk_index)
+        )
+        return (await self.db.execute(stmt)).all()
+
+    async def delete_for_file(
+        self, file_id: uuid.UUID, from_index: int = 0, commit: bool = True
+    ):
+        """Delete the chunk records of a file, with their MinHash bands.
 
         Args:
-            chunks (List[DocumentChunk]): list of chunk model instances.
+            file_id (uuid.UUID): the file whose chunks are removed.
+            from_index (int): first chunk_index to remove; all chunks by default.
+            commit (bool): commit right away; pass False to make the delete
+                part of a larger transaction.
         """
-        self.db.add_all(chunks)
-        await self.db.commit()
+        selected = (
+            DocumentChunk.file_id == file_id,
+            DocumentChunk.chunk_index >= from_index,
+        )
+        chunk_ids = select(DocumentChunk.id).where(*selected)
+        await self.db.execute(
+            delete(ChunkMinHashBand).where(ChunkMinHashBand.chunk_id.in_(chunk_ids))
+        )
+        await self.db.execute(delete(DocumentChunk).where(*selected))
+        if commit:
+            await self.db.commit()
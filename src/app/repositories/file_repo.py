@@ -1,10 +1,15 @@
 import uuid
+from datetime import UTC, datetime
 
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.db.routing import read_only
 from app.models.file_metadata import FileMetadata
 
+# Keeps IN lists well below driver parameter limits.
+BULK_SIZE = 1000
+
 
 class FileRepository:
     def __init__(self, db: AsyncSession):
@@ -15,10 +20,47 @@ class FileRepository:
         """
         self.db = db
 
+    async def get(self, file_id: uuid.UUID, user_id: uuid.UUID) -> FileMetadata | None:
+        """Lookup one of a user's files by id.
+
+        Args:
+            file_id (uuid.UUID): the file identifier.
+            user_id (uuid.UUID): owner to match.
+
+        Returns:
+            Optional[FileMetadata]: the metadata record if found.
+        """
+        stmt = select(FileMetadata).where(
+            FileMetadata.id == file_id, FileMetadata.user_id == user_id
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def lock(self, file_id: uuid.UUID) -> FileMetadata | None:
+        """Lock a file's row until the transaction ends and reload it.
+
+        Args:
+            file_id (uuid.UUID): the file identifier.
+
+        Returns:
+            Optional[FileMetadata]: the current metadata record if found.
+        """
+        stmt = (
+            select(FileMetadata)
+            .where(FileMetadata.id == file_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @read_only
     async def get_by_hash(
         self, file_hash: str, user_id: uuid.UUID
     ) -> FileMetadata | None:
-        """Lookup FileMetadata by SHA256 hash.
+        """Lookup a user's live FileMetadata by SHA256 hash.
+
+        Superseded versions are ignored, so their content counts as new.
 
         Args:
             file_hash (str): hex-encoded SHA256 of the file contents.
@@ -27,11 +69,68 @@ class FileRepository:
             Optional[FileMetadata]: the metadata record if found.
         """
         stmt = select(FileMetadata).where(
-            FileMetadata.file_hash == file_hash, FileMetadata.user_id == user_id
+            FileMetadata.file_hash == file_hash,
+            FileMetadata.user_id == user_id,
+            FileMetadata.status != "superseded",
         )
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
+    @read_only
+    async def get_by_hashes(
+        self, file_hashes: list[str], user_id: uuid.UUID
+    ) -> dict[str, FileMetadata]:
+        """Lookup many of a user's live files by SHA256 hash at once.
+
+        Superseded versions are ignored, as in ``get_by_hash``.
+
+        Args:
+            file_hashes (List[str]): hex-encoded SHA256 hashes; duplicates
+                are fine.
+            user_id (uuid.UUID): owner to match.
+
+        Returns:
+            dict[str, FileMetadata]: the records found, keyed by hash.
+        """
+        hashes = list(dict.fromkeys(file_hashes))
+        found = {}
+        for start in range(0, len(hashes), BULK_SIZE):
+            stmt = select(FileMetadata).where(
+                FileMetadata.file_hash.in_(hashes[start : start + BULK_SIZE]),
+                FileMetadata.user_id == user_id,
+                FileMetadata.status != "superseded",
+            )
+            for file in (await self.db.execute(stmt)).scalars():
+                found[file.file_hash] = file
+        return found
+
+    async def get_failed_before(self, cutoff: datetime) -> list[FileMetadata]:
+        """List files of any user that failed and were left alone since ``cutoff``.
+
+        Args:
+            cutoff (datetime): files last changed after this are skipped.
+
+        Returns:
+            List[FileMetadata]: the failed files.
+        """
+        stmt = select(FileMetadata).where(
+            FileMetadata.status == "failed",
+            func.coalesce(FileMetadata.updated_at, FileMetadata.created_at) < cutoff,
+        )
+        return list((await self.db.execute(stmt)).scalars())
+
+    async def touch(self, file_id: uuid.UUID):
+        """Set a file's ``updated_at`` to now, without committing.
+
+        Args:
+            file_id (uuid.UUID): the file identifier.
+        """
+        await self.db.execute(
+            update(FileMetadata)
+            .where(FileMetadata.id == file_id)
+            .values(updated_at=datetime.now(UTC))
+        )
+
     async def save(self, file: FileMetadata):
         """Save or update a FileMetadata record.
 
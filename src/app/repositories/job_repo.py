@@ -0,0 +1,60 @@
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ingest_job import IngestJob
+
+
+class IngestJobRepository:
+    def __init__(self, db: AsyncSession):
+        """Repository for ingestion job records.
+
+        Args:
+            db: an AsyncSession used for DB operations.
+        """
+        self.db = db
+
+    async def get(
+        self, job_id: uuid.UUID, user_id: uuid.UUID | None = None
+    ) -> IngestJob | None:
+        """Lookup a job by id, optionally restricted to its owner.
+
+        Args:
+            job_id (uuid.UUID): the job identifier.
+            user_id (uuid.UUID | None): owner to match, if given.
+
+        Returns:
+            Optional[IngestJob]: the job if found.
+        """
+        stmt = select(IngestJob).where(IngestJob.id == job_id)
+        if user_id is not None:
+            stmt = stmt.where(IngestJob.user_id == user_id)
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def get_many(self, job_ids: list[uuid.UUID]) -> list[IngestJob]:
+        """Lookup many jobs by id at once.
+
+        Args:
+            job_ids (List[uuid.UUID]): the job identifiers.
+
+        Returns:
+            List[IngestJob]: the jobs found, in no particular order.
+        """
+        stmt = select(IngestJob).where(IngestJob.id.in_(job_ids))
+        result = await self.db.execute(stmt)
+        return list(result.scalars())
+
+    async def save(self, job: IngestJob) -> IngestJob:
+        """Save or update a job record.
+
+        Args:
+            job (IngestJob): the model instance to persist.
+
+        Returns:
+            IngestJob: the persisted job.
+        """
+        self.db.add(job)
+        await self.db.commit()
+        return job
@@ -2,6 +2,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import func
 
+from app.core.db.routing import read_only
 from app.models.user import User
 
 
@@ -14,6 +15,7 @@ class UserRepository:
         """
         self.db = db
 
+    @read_only
     async def get_user(self, username: str) -> User | None:
         """Get a user by their username.
 
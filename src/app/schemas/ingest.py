@@ -1,5 +1,92 @@
-from pydantic import BaseModel
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, Field, field_validator
 
 
 class IngestResponse(BaseModel):
     status: str
+
+
+class IngestJobAccepted(BaseModel):
+    job_id: UUID
+    status: str
+
+
+class IngestJobStatus(BaseModel):
+    job_id: UUID
+    filename: str
+    size_bytes: int | None = None
+    status: str
+    stage: str | None = None
+    progress: float
+    file_id: UUID | None = None
+    replaces_file_id: UUID | None = None
+    error: str | None = None
+    timings: dict
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class IngestBatchResult(BaseModel):
+    filename: str
+    status: str
+    job_id: UUID | None = None
+    file_id: UUID | None = None
+    error: str | None = None
+    timings: dict = {}
+
+
+# Chunk metadata keys set by the server, which records may not supply.
+RESERVED_METADATA_KEYS = ("file_id", "user_id", "record_id", "source", "live")
+
+
+class TextRecord(BaseModel):
+    id: str
+    text: str = Field(min_length=1)
+    metadata: dict = {}
+
+    @field_validator("metadata")
+    @classmethod
+    def no_reserved_keys(cls, metadata: dict) -> dict:
+        reserved = [key for key in RESERVED_METADATA_KEYS if key in metadata]
+        if reserved:
+            raise ValueError(f"reserved keys not allowed: {', '.join(reserved)}")
+        return metadata
+
+
+class IngestRecordsResult(BaseModel):
+    status: str
+    file_id: UUID
+    records: int
+    invalid: int
+    # First few problems with invalid lines, with their line numbers.
+    errors: list[str]
+    bytes: int
+    chunks: int
+    records_per_sec: float
+    timings: dict
+
+
+class FileDigest(BaseModel):
+    sha256: str = Field(pattern="^[0-9a-f]{64}$")
+    size: int | None = None
+
+
+class IngestPrecheckRequest(BaseModel):
+    files: list[FileDigest] = Field(max_length=10000)
+
+
+class FileDigestStatus(BaseModel):
+    sha256: str
+    # False when the file is already ingested or being ingested.
+    needed: bool
+    file_id: UUID | None = None
+    status: str | None = None
+
+
+class IngestPrecheckResult(BaseModel):
+    files: list[FileDigestStatus]
+    needed: int
+    bytes_skipped: int
@@ -1,49 +1,81 @@
+import asyncio
+import re
 import uuid
 
 from fastapi.exceptions import HTTPException
 
+from app.core.answer_cache import answer_cache
+from app.core.audit_sink import audit_sink
+from app.core.config import settings
+from app.core.db.database import local_session
 from app.core.logging import get_logger
+from app.core.write_behind import write_behind
 from app.models.chat import ChatMessage
-from app.repositories.audit_repo import AuditRepository
 from app.repositories.chat_repo import ChatRepository, Conversation
 from app.services.retrieval_service import RetrievalService
-from app.utils.chains import build_streaming_chain
+from app.utils.chains import chain_pool
 from app.utils.history import format_history
+from app.utils.timing import StageTimer
 
 logger = get_logger(__name__)
 
+_TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+
+
+async def _replay_tokens(answer: str):
+    """Yield a cached answer word by word, mimicking the LLM token stream."""
+    for token in _TOKEN_PATTERN.findall(answer):
+        yield token
+
 
 class ChatService:
     """Service that handles chat operations and streaming responses.
 
     Methods:
         - stream_answer_sse: stream assistant tokens via Server-Sent Events.
+
+    Every database access opens its own short-lived session, so no pooled
+    connection is held while the LLM generates an answer. Messages and the
+    audit event of a turn are written behind (see ``WriteBehindPersister`` and
+    ``AuditSink``).
     """
 
-    def __init__(self, db):
-        self.db = db
-        self.chat_repo = ChatRepository(db)
-        self.audit_repo = AuditRepository(db)
+    def __init__(self):
         self.retrieval = RetrievalService()
-        self.chain = build_streaming_chain()
+        self.chain = chain_pool.get()
 
     async def validate_or_create_conversation_id(
         self, conversation_id, user_id: uuid.UUID
     ):
-        # Create conversation if not exists
-        if not conversation_id:
-            logger.info("No conversation ID provided; creating a new one.")
-            conversation = Conversation(user_id=user_id)
-            conversation_id = await self.chat_repo.create_conversation(conversation)
-        elif conversation_id and not await self.chat_repo.get_conversation(
-            conversation_id
-        ):
+        async with local_session() as db:
+            chat_repo = ChatRepository(db)
+            # Create conversation if not exists
+            if not conversation_id:
+                logger.info("No conversation ID provided; creating a new one.")
+                conversation = Conversation(user_id=user_id)
+                return await chat_repo.create_conversation(conversation)
+            exists = await chat_repo.get_conversation(conversation_id)
+        if not exists:
             logger.error("Conversation_id not found. Raising HTTP 404.")
             raise HTTPException(
                 status_code=404, detail="Conversation ID does not exist."
             )
         return conversation_id
 
+    async def _load_history(self, conversation_id, exclude_id: uuid.UUID):
+        """Return stored and still queued messages of a conversation, in order."""
+        # Taken before the query: a message committed in between is in either.
+        pending = write_behind.pending_messages(conversation_id)
+        async with local_session() as db:
+            stored = await ChatRepository(db).get_history(
+                conversation_id, exclude_id=exclude_id
+            )
+        messages = {m.uuid: m for m in stored}
+        for message in pending:
+            if message.uuid != exclude_id:
+                messages.setdefault(message.uuid, message)
+        return sorted(messages.values(), key=lambda m: m.created_at)
+
     async def stream_answer_sse(
         self, conversation_id, user_message: str, user_id: uuid.UUID
     ):
@@ -59,49 +91,75 @@ class ChatService:
         """
         yield ("event: conversation\n" f"data: {conversation_id}\n\n")
 
-        # Load history from DB
-        past_messages = await self.chat_repo.get_history(conversation_id)
-        history_text = format_history(past_messages)
+        user_chat_message = ChatMessage(
+            conversation_id=conversation_id,
+            role="user",
+            content=user_message,
+        )
 
-        # Retrieve context
-        docs = self.retrieval.retrieve(user_message, user_id)
-        print("Retrieved %d documents for context.", len(docs), docs[:2])
+        # Queue the user message, then load history and retrieve context concurrently
+        await write_behind.add(user_chat_message)
+        timer = StageTimer()
+        past_messages, (query_vector, docs) = await asyncio.gather(
+            timer.run(
+                "history",
+                self._load_history(conversation_id, user_chat_message.uuid),
+            ),
+            timer.run(
+                "retrieval",
+                self.retrieval.aretrieve_with_vector(
+                    user_message, user_id, timer=timer
+                ),
+            ),
+        )
+        history_text = format_history(past_messages)
+        logger.info(
+            "Retrieved %d documents for context. Pre-LLM timings (ms): %s",
+            len(docs),
+            timer.summary(),
+        )
 
-        # Persist user message
-        await self.chat_repo.save(
-            ChatMessage(
-                conversation_id=conversation_id,
-                role="user",
-                content=user_message,
-            )
+        # Serve repeated questions over an unchanged corpus from the answer cache.
+        # Follow-up questions depend on the conversation so far and are never
+        # cached: the same words mean something else after a different history.
+        chunk_ids = [doc.id for doc in docs]
+        use_cache = settings.ANSWER_CACHE_ENABLED and bool(docs) and not past_messages
+        cached_answer = (
+            answer_cache.lookup(user_id, query_vector, chunk_ids) if use_cache else None
         )
+        if cached_answer is not None:
+            logger.info("Answer cache hit for conversation %s", conversation_id)
+            tokens = _replay_tokens(cached_answer)
+        else:
+            tokens = self.chain.astream(
+                {
+                    "input": user_message,
+                    "context": docs,
+                    "history": history_text,
+                }
+            )
 
         full_answer = []
 
         # Stream response
-        async for token in self.chain.astream(
-            {
-                "input": user_message,
-                "context": docs,
-                "history": history_text,
-            }
-        ):
+        async for token in tokens:
             full_answer.append(token)
             logger.debug("Streaming token: %s", token)
             yield f"event: token\ndata:{token}\n\n"
 
-        # Persist assistant message
+        # Queue the assistant message and audit event
         final_answer = "".join(full_answer)
+        if use_cache and cached_answer is None:
+            answer_cache.store(user_id, query_vector, chunk_ids, final_answer)
 
-        await self.chat_repo.save(
+        await write_behind.add(
             ChatMessage(
                 conversation_id=conversation_id,
                 role="assistant",
                 content=final_answer,
             )
         )
-
-        await self.audit_repo.log(
+        await audit_sink.log(
             "CHAT_STREAM_COMPLETED",
             {"conversation_id": str(conversation_id)},
             user_id=user_id,
@@ -0,0 +1,98 @@
+import uuid
+from collections import defaultdict
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.db.database import local_session
+from app.core.logging import get_logger
+from app.repositories.chunk_repo import ChunkRepository
+from app.utils.minhash import MinHasher, MinHashLSH, band_keys, jaccard
+
+logger = get_logger(__name__)
+
+# Fixed seed: signatures are stored, so every process must hash the same way.
+minhasher = MinHasher(
+    settings.CHUNK_DEDUP_NUM_PERM, settings.CHUNK_DEDUP_SHINGLE_SIZE, seed=1
+)
+
+
+def chunk_signature(text: str) -> tuple[np.ndarray, list[int]]:
+    """Return the MinHash signature of a chunk and its LSH band keys."""
+    signature = minhasher.signature(text)
+    return signature, band_keys(signature, settings.CHUNK_DEDUP_BANDS)
+
+
+class NearDuplicateFilter:
+    """Drop chunks that nearly duplicate an earlier chunk of the same user.
+
+    A chunk is a near-duplicate when the Jaccard similarity estimated from
+    its MinHash signature reaches ``threshold`` against either a chunk kept
+    earlier in the same file (in-memory LSH index) or a stored chunk of
+    another file of the user (``chunk_minhash_bands`` lookup). The file
+    being ingested and the version it replaces are excluded from the lookup.
+    """
+
+    def __init__(
+        self,
+        user_id: uuid.UUID,
+        exclude_file_ids: list[uuid.UUID],
+        threshold: float = settings.CHUNK_DEDUP_THRESHOLD,
+    ):
+        self.user_id = user_id
+        self.exclude_file_ids = exclude_file_ids
+        self.threshold = threshold
+        self._local = MinHashLSH(settings.CHUNK_DEDUP_BANDS)
+        self.checked = 0
+        self.suppressed_in_file = 0
+        self.suppressed_in_corpus = 0
+
+    async def _stored_candidates(self, keys: list[int]) -> dict[int, list]:
+        async with local_session() as db:
+            rows = await ChunkRepository(db).find_by_band_keys(
+                self.user_id, keys, exclude_file_ids=self.exclude_file_ids
+            )
+        by_key = defaultdict(dict)
+        for band_key, chunk_id, minhash in rows:
+            by_key[band_key][chunk_id] = np.frombuffer(minhash, dtype=np.uint32)
+        return by_key
+
+    def _matches(self, signature: np.ndarray, candidates) -> bool:
+        return any(jaccard(signature, other) >= self.threshold for other in candidates)
+
+    async def keep(self, signatures: list[tuple[np.ndarray, list[int]]]) -> list[bool]:
+        """Decide which chunks of a batch to keep, in order.
+
+        Kept chunks are indexed, so later chunks are compared against them.
+
+        Args:
+            signatures: MinHash signature and band keys of each chunk.
+
+        Returns:
+            List[bool]: False for every near-duplicate.
+        """
+        stored = await self._stored_candidates(
+            [key for _, keys in signatures for key in keys]
+        )
+        mask = []
+        for signature, keys in signatures:
+            self.checked += 1
+            if self._matches(signature, self._local.candidates(keys)):
+                self.suppressed_in_file += 1
+                mask.append(False)
+                continue
+            others = {cid: sig for key in keys for cid, sig in stored[key].items()}
+            if self._matches(signature, others.values()):
+                self.suppressed_in_corpus += 1
+                mask.append(False)
+                continue
+            self._local.add(signature, keys)
+            mask.append(True)
+        return mask
+
+    def stats(self) -> dict:
+        return {
+            "checked": self.checked,
+            "suppressed_in_file": self.suppressed_in_file,
+            "suppressed_in_corpus": self.suppressed_in_corpus,
+        }
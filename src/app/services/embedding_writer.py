@@ -0,0 +1,347 @@
+import asyncio
+import hashlib
+import random
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+import openai
+import tiktoken
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import settings
+from app.core.db.database import local_session
+from app.core.logging import get_logger
+from app.repositories.chunk_embedding_repo import ChunkEmbeddingRepository
+
+logger = get_logger(__name__)
+
+# Rough characters-per-token ratio used when no tiktoken encoding is available.
+_CHARS_PER_TOKEN = 4
+
+# Errors worth retrying without slowing everybody else down.
+_TRANSIENT_ERRORS = (
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # The BPE files are downloaded on first use; fall back to an estimate
+        # rather than failing ingestion when they cannot be fetched.
+        logger.warning("No tiktoken encoding for %s, estimating tokens: %s", model, e)
+        return None
+
+
+def content_hash(model: str, text: str) -> str:
+    """Return the ``chunk_embeddings`` key of ``text`` embedded by ``model``."""
+    return hashlib.sha256(f"{model}\0{text}".encode()).hexdigest()
+
+
+def count_tokens(texts: list[str], model: str) -> list[int]:
+    """Return the number of tokens of each text for ``model``."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return [len(t) // _CHARS_PER_TOKEN + 1 for t in texts]
+    return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+
+
+def token_batches(
+    token_counts: list[int], max_tokens: int, max_size: int
+) -> list[range]:
+    """Split items into consecutive batches bounded by tokens and item count.
+
+    A single item larger than ``max_tokens`` gets a batch of its own.
+
+    Args:
+        token_counts (list[int]): number of tokens of each item.
+        max_tokens (int): token budget of a batch.
+        max_size (int): maximum number of items in a batch.
+
+    Returns:
+        list[range]: index ranges of the batches, in order.
+    """
+    batches = []
+    start, tokens = 0, 0
+    for i, count in enumerate(token_counts):
+        if i > start and (tokens + count > max_tokens or i - start >= max_size):
+            batches.append(range(start, i))
+            start, tokens = i, 0
+        tokens += count
+    if start < len(token_counts):
+        batches.append(range(start, len(token_counts)))
+    return batches
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that backs off on rate limiting.
+
+    The limit is halved and every caller pauses when the provider answers
+    429; it grows back by one slot after ``recover_after`` successes.
+    """
+
+    def __init__(self, max_concurrency: int, recover_after: int = 4):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self.recover_after = recover_after
+        self._active = 0
+        self._successes = 0
+        self._resume_at = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+        while (delay := self._resume_at - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+    async def release(self) -> None:
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    async def succeeded(self) -> None:
+        async with self._cond:
+            self._successes += 1
+            if self.limit < self.max_concurrency and (
+                self._successes >= self.recover_after
+            ):
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    async def throttled(self, delay: float) -> None:
+        async with self._cond:
+            self.limit = max(1, self.limit // 2)
+            self._successes = 0
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+
+@dataclass
+class EmbeddingWriteStats:
+    chunks: int = 0
+    tokens: int = 0
+    batches: int = 0
+    reused: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    seconds: float = 0.0
+    final_concurrency: int = 0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    @property
+    def reuse_rate(self) -> float:
+        return self.reused / self.chunks if self.chunks else 0.0
+
+
+# Totals of every writer of the process. Reuse is only reported here, to
+# operators: the store is shared by all users, so a job's reuse count would
+# tell its owner that another user already uploaded the same text.
+write_totals = EmbeddingWriteStats()
+
+
+def write_stats() -> dict:
+    """Return the chunks embedded by this process and how many were reused."""
+    return {
+        "chunks": write_totals.chunks,
+        "reused": write_totals.reused,
+        "reuse_rate": round(write_totals.reuse_rate, 3),
+        "tokens": write_totals.tokens,
+        "retries": write_totals.retries,
+    }
+
+
+class EmbeddingWriter:
+    """Embed batches of chunks and write each batch to Chroma.
+
+    ``write_batch`` may be called concurrently; calls share an
+    ``AdaptiveLimiter``. Vectors are kept in the content-addressed
+    ``chunk_embeddings`` store, keyed by model and exact chunk text, so text
+    seen in any earlier upload (boilerplate, re-uploads by other users) is
+    never sent to the embedding API again. Rate limiting and transient provider errors are
+    retried with exponential backoff (honouring ``Retry-After``); every batch
+    is upserted as soon as it is embedded, so a retry never repeats finished
+    work.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        vectorstore,
+        model: str = settings.EMBEDDING_MODEL,
+        max_tokens: int = settings.EMBEDDING_BATCH_MAX_TOKENS,
+        max_size: int = settings.EMBEDDING_BATCH_MAX_SIZE,
+        concurrency: int = settings.EMBEDDING_WRITE_CONCURRENCY,
+        max_retries: int = settings.EMBEDDING_WRITE_MAX_RETRIES,
+        base_delay: float = settings.EMBEDDING_RETRY_BASE_DELAY,
+        max_delay: float = settings.EMBEDDING_RETRY_MAX_DELAY,
+        reuse_vectors: bool = settings.EMBEDDING_STORE_ENABLED,
+    ):
+        self.embeddings = embeddings
+        self.vectorstore = vectorstore
+        self.model = model
+        self.max_tokens = max_tokens
+        self.max_size = max_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.reuse_vectors = reuse_vectors
+        self.limiter = AdaptiveLimiter(concurrency)
+        self.stats = EmbeddingWriteStats()
+        self._collection = vectorstore._collection
+
+    async def _lookup(self, hashes: list[str]) -> dict[str, list[float]]:
+        async with local_session() as db:
+            return await ChunkEmbeddingRepository(db).get_many(hashes)
+
+    async def _remember(self, vectors: dict[str, list[float]]) -> None:
+        async with local_session() as db:
+            await ChunkEmbeddingRepository(db).save_many(self.model, vectors)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        retry_after = (
+            response.headers.get("retry-after") if response is not None else None
+        )
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_delay)
+            except ValueError:
+                pass
+        delay = min(self.base_delay * 2**attempt, self.max_delay)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _embed(self, texts: list[str]) -> list[list[float]]:
+        limiter, stats = self.limiter, self.stats
+        attempt = 0
+        while True:
+            await limiter.acquire()
+            try:
+                vectors = await self.embeddings.aembed_documents(texts)
+            except openai.RateLimitError as e:
+                error, rate_limited = e, True
+            except _TRANSIENT_ERRORS as e:
+                error, rate_limited = e, False
+            else:
+                await limiter.succeeded()
+                return vectors
+            finally:
+                await limiter.release()
+
+            if attempt >= self.max_retries:
+                raise error
+            delay = self._backoff(attempt, error)
+            attempt += 1
+            stats.retries += 1
+            write_totals.retries += 1
+            if rate_limited:
+                stats.rate_limited += 1
+                await limiter.throttled(delay)
+            logger.warning(
+                "Embedding batch of %d failed (%s), retry %d in %.1fs",
+                len(texts),
+                type(error).__name__,
+                attempt,
+                delay,
+            )
+            if not rate_limited:
+                await asyncio.sleep(delay)
+
+    async def write_batch(
+        self,
+        ids: list[str],
+        texts: list[str],
+        metadatas: list[dict],
+        tokens: int = 0,
+    ) -> None:
+        """Embed one batch of chunks and upsert it into the vector store.
+
+        Args:
+            ids (list[str]): Chroma ids of the chunks.
+            texts (list[str]): chunk contents.
+            metadatas (list[dict]): one non-empty metadata dict per chunk.
+            tokens (int): token count of the batch, for statistics.
+        """
+        hashes = [content_hash(self.model, text) for text in texts]
+        known = await self._lookup(hashes) if self.reuse_vectors else {}
+        # Embed each missing text once, even if it repeats within the batch.
+        missing = {h: text for h, text in zip(hashes, texts) if h not in known}
+        fresh = {}
+        if missing:
+            embedded = await self._embed(list(missing.values()))
+            fresh = dict(zip(missing, embedded))
+            if self.reuse_vectors:
+                await self._remember(fresh)
+        vectors = [known[h] if h in known else fresh[h] for h in hashes]
+        await asyncio.to_thread(
+            self._collection.upsert,
+            ids=ids,
+            embeddings=vectors,
+            documents=texts,
+            metadatas=metadatas,
+        )
+        for stats in (self.stats, write_totals):
+            stats.chunks += len(ids)
+            stats.reused += len(ids) - len(missing)
+            stats.tokens += tokens
+            stats.batches += 1
+
+    async def update_metadata(self, ids: list[str], metadatas: list[dict]) -> None:
+        """Update the metadata of stored chunks without touching their vectors.
+
+        Keys missing from a chunk's new metadata keep their stored value.
+        """
+        for start in range(0, len(ids), self.max_size):
+            await asyncio.to_thread(
+                self._collection.update,
+                ids=ids[start : start + self.max_size],
+                metadatas=metadatas[start : start + self.max_size],
+            )
+
+    async def delete(self, ids: list[str]) -> None:
+        """Delete stored chunks by Chroma id."""
+        if ids:
+            await asyncio.to_thread(self._collection.delete, ids=ids)
+
+    async def delete_file(self, file_id) -> None:
+        """Delete every stored chunk whose metadata names ``file_id``."""
+        await asyncio.to_thread(
+            self._collection.delete, where={"file_id": str(file_id)}
+        )
+
+    async def file_ids(self, file_id) -> list[str]:
+        """Return the ids of every stored chunk whose metadata names ``file_id``."""
+        found = await asyncio.to_thread(
+            self._collection.get, where={"file_id": str(file_id)}, include=[]
+        )
+        return found["ids"]
+
+    def finish(self, seconds: float) -> EmbeddingWriteStats:
+        """Record the elapsed time of the write and log its statistics."""
+        self.stats.seconds = seconds
+        self.stats.final_concurrency = self.limiter.limit
+        logger.info(
+            "Embedded %d chunks (%d tokens) in %d batches: %.2fs, %.1f chunks/s, "
+            "%.0f%% reused, %d retries, %d rate limited",
+            self.stats.chunks,
+            self.stats.tokens,
+            self.stats.batches,
+            self.stats.seconds,
+            self.stats.chunks_per_second,
+            self.stats.reuse_rate * 100,
+            self.stats.retries,
+            self.stats.rate_limited,
+        )
+        return self.stats
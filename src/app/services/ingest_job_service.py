@@ -0,0 +1,338 @@
+import asyncio
+import time
+import uuid
+from collections.abc import AsyncIterator
+
+from fastapi import UploadFile, status
+from fastapi.exceptions import HTTPException
+
+from app.core.config import settings
+from app.core.custom_exceptions import QueueFullException
+from app.core.db.database import local_session
+from app.core.logging import get_logger
+from app.models.ingest_job import IngestJob
+from app.repositories.file_repo import FileRepository
+from app.repositories.job_repo import IngestJobRepository
+from app.schemas.ingest import (
+    FileDigest,
+    FileDigestStatus,
+    IngestBatchResult,
+    IngestPrecheckResult,
+)
+from app.services.ingest_service import is_retryable
+from app.services.job_queue import job_queue
+from app.utils.upload import SpooledUpload, remove_spooled, spool_upload
+
+logger = get_logger(__name__)
+
+DUPLICATE_DETAIL = "This file is already ingested. Please choose a different file."
+
+# Job statuses set by ``run_ingest_job`` once a job is over.
+FINISHED_STATUSES = {"succeeded", "failed", "duplicate"}
+
+
+def upload_needed(file) -> bool:
+    """Whether a file with this hash still has to be uploaded and ingested.
+
+    Args:
+        file (FileMetadata | None): the user's file with the same hash.
+    """
+    return file is None or is_retryable(file)
+
+
+class IngestJobService:
+    """Service that accepts uploads as background ingestion jobs.
+
+    Responsibilities:
+      - stream the upload to disk once, hashing it on the way
+      - tell clients which files they need to upload, by hash
+      - reject already ingested files before queueing them
+      - create the job record and queue it
+      - queue a batch of uploads, reporting each file as it finishes
+      - report job status to its owner
+    """
+
+    def __init__(self, db):
+        """Initialize repositories.
+
+        Args:
+            db: a database session/connection used by repositories.
+        """
+        self.db = db
+        self.jobs = IngestJobRepository(db)
+        self.files = FileRepository(db)
+
+    async def _create_job(
+        self,
+        file: UploadFile,
+        user_id: uuid.UUID,
+        replaces: uuid.UUID | None = None,
+    ) -> IngestJob:
+        """Spool ``file`` and record a queued job for it, without running it.
+
+        Raises:
+            HTTPException: 404 for an unknown file to replace, 409 for an
+            already ingested file or one that cannot be replaced.
+        """
+        if replaces is not None:
+            previous = await self.files.get(replaces, user_id)
+            if previous is None:
+                raise HTTPException(status_code=404, detail="File does not exist.")
+            if previous.status != "processed":
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Only a processed file can be replaced by a new version.",
+                )
+        spooled = await spool_upload(file, settings.INGEST_SPOOL_DIR)
+        existing = await self.files.get_by_hash(spooled.file_hash, user_id)
+        if not upload_needed(existing):
+            await remove_spooled(spooled.path)
+            logger.info("Duplicate file detected for %s", file.filename)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail=DUPLICATE_DETAIL
+            )
+        return await self._save_job(file.filename, spooled, user_id, replaces)
+
+    async def _save_job(
+        self,
+        filename: str,
+        spooled: SpooledUpload,
+        user_id: uuid.UUID,
+        replaces: uuid.UUID | None = None,
+    ) -> IngestJob:
+        return await self.jobs.save(
+            IngestJob(
+                filename=filename,
+                spool_path=spooled.path,
+                file_hash=spooled.file_hash,
+                size_bytes=spooled.size,
+                user_id=user_id,
+                replaces_file_id=replaces,
+                timings={
+                    "upload": round(spooled.seconds * 1000, 1),
+                    "upload_bytes_per_sec": round(spooled.bytes_per_second),
+                },
+            )
+        )
+
+    async def _enqueue(self, job: IngestJob) -> None:
+        """Queue ``job``, failing it and dropping its upload if the queue is full.
+
+        Raises:
+            QueueFullException: when the queue is at capacity.
+        """
+        try:
+            await job_queue.enqueue(job.id)
+        except QueueFullException as e:
+            logger.warning("Rejecting ingest job %s: %s", job.id, e.detail)
+            job.status = "failed"
+            job.error = e.detail
+            await self.jobs.save(job)
+            await remove_spooled(job.spool_path)
+            raise
+
+    async def submit(
+        self,
+        file: UploadFile,
+        user_id: uuid.UUID,
+        replaces: uuid.UUID | None = None,
+    ) -> IngestJob:
+        """Spool ``file`` and queue it for ingestion.
+
+        Args:
+            file (UploadFile): the uploaded file.
+            user_id (uuid.UUID): owner of the file.
+            replaces (uuid.UUID | None): file this upload is a new version of.
+
+        Returns:
+            IngestJob: the queued job.
+
+        Raises:
+            HTTPException: 404 for an unknown file to replace, 409 for an
+            already ingested file or one that cannot be replaced, 503 when
+            the ingestion queue is full.
+        """
+        job = await self._create_job(file, user_id, replaces)
+        try:
+            await self._enqueue(job)
+        except QueueFullException as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=e.detail
+            ) from e
+        logger.info("Queued ingest job %s for %s", job.id, file.filename)
+        return job
+
+    async def precheck(
+        self, digests: list[FileDigest], user_id: uuid.UUID
+    ) -> IngestPrecheckResult:
+        """Tell a client which of its files need uploading, by content hash.
+
+        Args:
+            digests (List[FileDigest]): SHA256 and size of each local file.
+            user_id (uuid.UUID): owner of the files.
+
+        Returns:
+            IngestPrecheckResult: one answer per digest, in order, with the
+            number of uploads needed and the bytes the client can skip.
+        """
+        known = await self.files.get_by_hashes([d.sha256 for d in digests], user_id)
+        answers = []
+        bytes_skipped = 0
+        for digest in digests:
+            file = known.get(digest.sha256)
+            needed = upload_needed(file)
+            if not needed:
+                bytes_skipped += digest.size or 0
+            answers.append(
+                FileDigestStatus(
+                    sha256=digest.sha256,
+                    needed=needed,
+                    file_id=file.id if file else None,
+                    status=file.status if file else None,
+                )
+            )
+        needed_count = sum(a.needed for a in answers)
+        logger.info(
+            "Precheck for user %s: %d of %d files needed, %d bytes skipped",
+            user_id,
+            needed_count,
+            len(answers),
+            bytes_skipped,
+        )
+        return IngestPrecheckResult(
+            files=answers, needed=needed_count, bytes_skipped=bytes_skipped
+        )
+
+    async def submit_batch(
+        self, files: list[UploadFile], user_id: uuid.UUID
+    ) -> tuple[list[IngestJob], list[IngestBatchResult]]:
+        """Spool every file of a batch and record a job for each.
+
+        All files are spooled before anything runs, so the request body can
+        be released while the batch is still being ingested. Duplicates,
+        within the batch or of the user's files, are found with one query.
+
+        Args:
+            files (List[UploadFile]): the uploaded files.
+            user_id (uuid.UUID): owner of the files.
+
+        Returns:
+            tuple: the jobs to run, and a result for every file rejected
+            up front (duplicates).
+        """
+        spooled = [await spool_upload(f, settings.INGEST_SPOOL_DIR) for f in files]
+        known = await self.files.get_by_hashes([s.file_hash for s in spooled], user_id)
+        jobs, rejected, seen = [], [], set()
+        for file, upload in zip(files, spooled):
+            if upload.file_hash in seen or not upload_needed(
+                known.get(upload.file_hash)
+            ):
+                await remove_spooled(upload.path)
+                rejected.append(
+                    IngestBatchResult(
+                        filename=file.filename,
+                        status="duplicate",
+                        error=DUPLICATE_DETAIL,
+                    )
+                )
+                continue
+            seen.add(upload.file_hash)
+            jobs.append(await self._save_job(file.filename, upload, user_id))
+        logger.info(
+            "Accepted %d of %d files of an ingest batch for user %s",
+            len(jobs),
+            len(files),
+            user_id,
+        )
+        return jobs, rejected
+
+    @staticmethod
+    def _result(job: IngestJob) -> IngestBatchResult:
+        return IngestBatchResult(
+            filename=job.filename,
+            status=job.status,
+            job_id=job.id,
+            file_id=job.file_id,
+            error=job.error,
+            timings=job.timings,
+        )
+
+    async def stream_batch(
+        self,
+        jobs: list[IngestJob],
+        rejected: list[IngestBatchResult],
+        poll_interval: float = settings.INGEST_BATCH_POLL_INTERVAL,
+        max_wait: float = settings.INGEST_BATCH_MAX_WAIT,
+    ) -> AsyncIterator[str]:
+        """Queue the jobs of a batch and yield one NDJSON line per file.
+
+        Rejected files are reported first. The jobs then go through the job
+        queue like single uploads, so they share its workers, and each one
+        is reported as soon as it finishes. Jobs the full queue refuses are
+        reported as failed. Jobs not finished after ``max_wait`` seconds are
+        reported with status ``timeout`` and the stream ends. The jobs keep
+        running if the client goes away or the stream times out; their
+        status stays available from the job status endpoint.
+
+        Args:
+            jobs (List[IngestJob]): jobs created by ``submit_batch``.
+            rejected (List[IngestBatchResult]): files rejected up front.
+            poll_interval (float): seconds between job status checks.
+            max_wait (float): seconds to wait for the jobs to finish.
+
+        Yields:
+            str: an ``IngestBatchResult`` as a JSON line.
+        """
+        for result in rejected:
+            yield result.model_dump_json() + "\n"
+        pending = {}
+        for job in jobs:
+            try:
+                await self._enqueue(job)
+            except QueueFullException:
+                yield self._result(job).model_dump_json() + "\n"
+                continue
+            pending[job.id] = job.filename
+        deadline = time.monotonic() + max_wait
+        while pending and time.monotonic() < deadline:
+            await asyncio.sleep(poll_interval)
+            async with local_session() as db:
+                polled = await IngestJobRepository(db).get_many(list(pending))
+            finished = [job for job in polled if job.status in FINISHED_STATUSES]
+            for job in finished:
+                del pending[job.id]
+                yield self._result(job).model_dump_json() + "\n"
+        for job_id, filename in pending.items():
+            logger.warning("Ingest batch stopped waiting for job %s", job_id)
+            result = IngestBatchResult(
+                filename=filename,
+                status="timeout",
+                job_id=job_id,
+                error=f"Still ingesting; see /api/v1/ingest/jobs/{job_id}",
+            )
+            yield result.model_dump_json() + "\n"
+
+    async def get_status(self, job_id: uuid.UUID, user_id: uuid.UUID) -> dict:
+        """Return the status of one of ``user_id``'s jobs.
+
+        Raises:
+            HTTPException: 404 when the job does not exist for this user.
+        """
+        job = await self.jobs.get(job_id, user_id=user_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Ingest job does not exist.")
+        return {
+            "job_id": job.id,
+            "filename": job.filename,
+            "size_bytes": job.size_bytes,
+            "status": job.status,
+            "stage": job.stage,
+            "progress": job.progress,
+            "file_id": job.file_id,
+            "replaces_file_id": job.replaces_file_id,
+            "error": job.error,
+            "timings": job.timings,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+        }
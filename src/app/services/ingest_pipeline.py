@@ -0,0 +1,457 @@
+import asyncio
+import hashlib
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+
+import numpy as np
+from langchain_core.documents import Document
+from uuid6 import uuid7
+
+from app.core.config import settings
+from app.core.db.database import local_session
+from app.core.logging import get_logger
+from app.core.registry import registry
+from app.models.ingest_checkpoint import IngestCheckpoint
+from app.repositories.bulk import BulkWriteStats
+from app.repositories.checkpoint_repo import CheckpointRepository
+from app.repositories.chunk_repo import ChunkRepository
+from app.repositories.file_repo import FileRepository
+from app.services.chunk_dedup import NearDuplicateFilter, chunk_signature
+from app.services.embedding_writer import (
+    EmbeddingWriter,
+    content_hash,
+    count_tokens,
+    token_batches,
+)
+from app.utils.chunking import chunk_documents
+from app.utils.file_loader import iter_documents
+from app.utils.timing import StageMetrics
+
+logger = get_logger(__name__)
+
+# Called with the fraction of the file that has been fully stored (0..1).
+StoredCallback = Callable[[float], Awaitable[None]]
+
+# Batches of documents with the fraction of the source read so far (0..1).
+DocumentSource = AsyncIterator[tuple[list[Document], float]]
+
+# Chroma ids of new chunks derive from the file, position and content, so a
+# retried batch overwrites the vectors of the failed attempt.
+CHUNK_ID_NAMESPACE = uuid.UUID("3bd7a8e7-86fa-451d-9807-f21cea4ae90c")
+
+
+@dataclass
+class ChunkBatch:
+    number: int
+    batch_hash: str
+    start_index: int
+    ids: list[str]
+    texts: list[str]
+    metadatas: list[dict]
+    tokens: int
+    # Fraction of the file parsed once this batch was cut.
+    fraction: float
+    # MinHash signature and band keys per chunk, when deduplicating.
+    signatures: list[tuple[np.ndarray, list[int]] | None]
+    content_hashes: list[str]
+    # Chunks whose vector is taken over from the replaced file version.
+    reused: list[bool]
+    # Stored by an earlier attempt at this file; nothing is written again.
+    resumed: bool
+
+
+def _split(documents: list[Document], model: str, dedup: bool):
+    chunks = chunk_documents(documents)
+    texts = [c.page_content for c in chunks]
+    signatures = [chunk_signature(t) for t in texts] if dedup else [None] * len(chunks)
+    return list(zip(chunks, count_tokens(texts, model), signatures))
+
+
+class IngestPipeline:
+    """Stream a spooled file (or text records) through load, chunk, embed
+    and store stages.
+
+    Stages run concurrently and hand batches over asyncio queues of
+    ``INGEST_PIPELINE_QUEUE_SIZE`` entries, so a slow stage (normally
+    embedding) holds back the ones before it and only a few batches of the
+    file are in memory at any time:
+
+      - load: parses page ranges in the parse process pool, or reads the
+        documents given to ``run_documents``
+      - chunk: splits pages into chunks, drops near-duplicates (see
+        ``NearDuplicateFilter``) and groups the rest into token-budgeted
+        batches
+      - embed: embeds and upserts batches into Chroma, several at once
+      - store: bulk inserts the DocumentChunk rows of every upserted batch
+
+    Each stage records its throughput and input queue depth in ``metrics``.
+    Database writes use a short-lived session per batch, so no connection is
+    held while batches are parsed or embedded.
+
+    When the file is a new version of an existing file, its chunks are
+    aligned with the old version's chunks by content hash: unchanged chunks
+    keep their Chroma id and vector and are not written to Chroma at all.
+    Their new metadata is kept in ``reused_metadata`` and the old chunks
+    left unmatched in ``removed_ids``, for the caller to apply on swap.
+
+    Every stored batch commits an ``IngestCheckpoint`` with its chunk rows.
+    A retry of a failed file passes those checkpoints back in: batches that
+    split the same way are skipped, and from the first batch that does not
+    match, the rows of the failed attempt are dropped and work starts over.
+    """
+
+    def __init__(
+        self,
+        writer: EmbeddingWriter,
+        file_id: uuid.UUID,
+        user_id: uuid.UUID,
+        on_stored: StoredCallback | None = None,
+        previous_file_id: uuid.UUID | None = None,
+        previous_chunks: list[tuple[str, str | None]] | None = None,
+        checkpoints: dict[int, str] | None = None,
+        page_cache_dir: str | None = None,
+    ):
+        """Initialize the pipeline for one file.
+
+        Args:
+            writer (EmbeddingWriter): writer for the user's vector store.
+            file_id (uuid.UUID): FileMetadata id the chunks belong to.
+            user_id (uuid.UUID): owner of the file.
+            on_stored (StoredCallback | None): optional coroutine called after
+                each stored batch with the fraction of the file completed.
+            previous_file_id (uuid.UUID | None): file this one is a new
+                version of.
+            previous_chunks (List[tuple[str, Optional[str]]]): Chroma id and
+                content hash of every chunk of the previous version.
+            checkpoints (dict[int, str] | None): batch hashes committed by an
+                earlier attempt, when retrying a failed file.
+            page_cache_dir (str | None): directory caching the parsed pages
+                of this file.
+        """
+        self.writer = writer
+        self.file_id = file_id
+        self.user_id = user_id
+        self.on_stored = on_stored
+        self.dedup = (
+            NearDuplicateFilter(
+                user_id, [f for f in (file_id, previous_file_id) if f is not None]
+            )
+            if settings.CHUNK_DEDUP_ENABLED
+            else None
+        )
+        self._previous = defaultdict(list)
+        for chroma_id, chunk_hash in previous_chunks or ():
+            if chunk_hash is not None:
+                self._previous[chunk_hash].append(chroma_id)
+        self._previous_ids = [chroma_id for chroma_id, _ in previous_chunks or ()]
+        self.reused_metadata: dict[str, dict] = {}
+        self.page_cache_dir = page_cache_dir
+        self._retry = checkpoints is not None
+        self._checkpoints = dict(checkpoints or {})
+        # Chroma ids of the chunks this file owns (not taken over).
+        self._own_ids: set[str] = set()
+        self.chunk_count = 0
+        self.batch_count = 0
+        self.resumed_batches = 0
+        self.resumed_chunks = 0
+        self.db_writes = BulkWriteStats()
+        self.metrics = {
+            name: StageMetrics(name) for name in ("load", "chunk", "embed", "store")
+        }
+        self._stored_fraction = 0.0
+
+    @staticmethod
+    async def _take(queue: asyncio.Queue, metrics: StageMetrics):
+        metrics.observe_queue(queue.qsize())
+        return await queue.get()
+
+    async def _load(self, documents: DocumentSource, out: asyncio.Queue):
+        metrics = self.metrics["load"]
+        try:
+            while True:
+                with metrics.busy():
+                    item = await anext(documents, None)
+                if item is None:
+                    break
+                metrics.count(len(item[0]))
+                await out.put(item)
+        finally:
+            await documents.aclose()
+        await out.put(None)
+
+    @property
+    def removed_ids(self) -> list[str]:
+        """Chroma ids of the previous version's chunks that were not reused."""
+        return [i for i in self._previous_ids if i not in self.reused_metadata]
+
+    def _reuse(self, chunk_hash: str) -> str | None:
+        ids = self._previous.get(chunk_hash)
+        return ids.pop(0) if ids else None
+
+    def _cut(self, items, fraction: float) -> ChunkBatch:
+        chunks, token_counts, signatures = zip(*items)
+        hashes = [content_hash(self.writer.model, c.page_content) for c in chunks]
+        old_ids = [self._reuse(h) for h in hashes]
+        start, number = self.chunk_count, self.batch_count
+        self.chunk_count += len(chunks)
+        self.batch_count += 1
+        ids = [
+            old_id
+            or str(uuid.uuid5(CHUNK_ID_NAMESPACE, f"{self.file_id}:{start + i}:{h}"))
+            for i, (old_id, h) in enumerate(zip(old_ids, hashes))
+        ]
+        self._own_ids.update(i for i, old_id in zip(ids, old_ids) if old_id is None)
+        batch_hash = hashlib.sha256("\n".join(hashes).encode()).hexdigest()
+        resumed = self._checkpoints.get(number) == batch_hash
+        if resumed:
+            self.resumed_batches += 1
+            self.resumed_chunks += len(chunks)
+        return ChunkBatch(
+            number=number,
+            batch_hash=batch_hash,
+            start_index=start,
+            ids=ids,
+            texts=[c.page_content for c in chunks],
+            metadatas=[
+                {
+                    **c.metadata,
+                    "file_id": str(self.file_id),
+                    "user_id": str(self.user_id),
+                    "live": False,
+                }
+                for c in chunks
+            ],
+            tokens=sum(token_counts),
+            fraction=fraction,
+            signatures=list(signatures),
+            content_hashes=hashes,
+            reused=[old_id is not None for old_id in old_ids],
+            resumed=resumed,
+        )
+
+    async def _invalidate(self, batch: ChunkBatch):
+        """Drop what an earlier attempt stored from ``batch`` on."""
+        logger.info(
+            "File %s no longer matches its checkpoints from batch %d, "
+            "resuming from chunk %d",
+            self.file_id,
+            batch.number,
+            batch.start_index,
+        )
+        async with local_session() as db:
+            await CheckpointRepository(db).delete_for_file(
+                self.file_id, from_batch=batch.number, commit=False
+            )
+            await ChunkRepository(db).delete_for_file(
+                self.file_id, from_index=batch.start_index
+            )
+        self._checkpoints = {}
+
+    async def _emit(self, batch: ChunkBatch, out: asyncio.Queue):
+        if not batch.resumed and self._checkpoints:
+            await self._invalidate(batch)
+        await out.put(batch)
+
+    async def _chunk(self, inp: asyncio.Queue, out: asyncio.Queue, consumers: int):
+        metrics = self.metrics["chunk"]
+        model = self.writer.model
+        # (chunk, token count, signature) not yet cut into a batch
+        pending = []
+        while (item := await self._take(inp, metrics)) is not None:
+            documents, fraction = item
+            with metrics.busy():
+                items = await asyncio.to_thread(
+                    _split, documents, model, self.dedup is not None
+                )
+                if self.dedup is not None:
+                    mask = await self.dedup.keep([i[2] for i in items])
+                    items = [i for i, keep in zip(items, mask) if keep]
+                pending += items
+                batches = token_batches(
+                    [i[1] for i in pending],
+                    self.writer.max_tokens,
+                    self.writer.max_size,
+                )
+            # The last batch may still grow with the next pages.
+            for batch in batches[:-1]:
+                metrics.count(len(batch))
+                await self._emit(
+                    self._cut(pending[batch.start : batch.stop], fraction), out
+                )
+            if len(batches) > 1:
+                pending = pending[batches[-1].start :]
+        if pending:
+            metrics.count(len(pending))
+            await self._emit(self._cut(pending, 1.0), out)
+        for _ in range(consumers):
+            await out.put(None)
+
+    async def _embed(self, inp: asyncio.Queue, out: asyncio.Queue):
+        metrics = self.metrics["embed"]
+        while (batch := await self._take(inp, metrics)) is not None:
+            new = [i for i, reused in enumerate(batch.reused) if not reused]
+            for i, reused in enumerate(batch.reused):
+                if reused:
+                    self.reused_metadata[batch.ids[i]] = {
+                        **batch.metadatas[i],
+                        "live": True,
+                    }
+            with metrics.busy():
+                if new and not batch.resumed:
+                    await self.writer.write_batch(
+                        [batch.ids[i] for i in new],
+                        [batch.texts[i] for i in new],
+                        [batch.metadatas[i] for i in new],
+                        batch.tokens,
+                    )
+            metrics.count(len(batch.ids))
+            await out.put(batch)
+        await out.put(None)
+
+    async def _store(self, inp: asyncio.Queue, producers: int):
+        metrics = self.metrics["store"]
+        while producers:
+            batch = await self._take(inp, metrics)
+            if batch is None:
+                producers -= 1
+                continue
+            if batch.resumed:
+                await self._stored(batch)
+                continue
+            rows, bands = [], []
+            for i, (chroma_id, signature, chunk_hash) in enumerate(
+                zip(batch.ids, batch.signatures, batch.content_hashes)
+            ):
+                chunk_id = uuid7()
+                rows.append(
+                    {
+                        "id": chunk_id,
+                        "file_id": self.file_id,
+                        "chunk_index": batch.start_index + i,
+                        "chroma_id": chroma_id,
+                        "user_id": self.user_id,
+                        "content_hash": chunk_hash,
+                        "minhash": signature[0].tobytes() if signature else None,
+                    }
+                )
+                if signature:
+                    bands += [
+                        {"chunk_id": chunk_id, "band_key": key, "user_id": self.user_id}
+                        for key in signature[1]
+                    ]
+            checkpoint = IngestCheckpoint(
+                file_id=self.file_id,
+                batch_number=batch.number,
+                batch_hash=batch.batch_hash,
+                start_index=batch.start_index,
+                chunk_count=len(rows),
+            )
+            with metrics.busy():
+                async with local_session() as db:
+                    self.db_writes.add(
+                        await ChunkRepository(db).insert_many(rows, bands)
+                    )
+                    # Shows the ingestion is alive (see ``is_retryable``).
+                    await FileRepository(db).touch(self.file_id)
+                    await CheckpointRepository(db).save(checkpoint)
+            metrics.count(len(rows))
+            await self._stored(batch)
+
+    async def _stored(self, batch: ChunkBatch):
+        if self.on_stored is not None and batch.fraction > self._stored_fraction:
+            self._stored_fraction = batch.fraction
+            await self.on_stored(batch.fraction)
+
+    async def _drop_stale(self):
+        """Remove what a failed attempt stored beyond this run's chunks."""
+        async with local_session() as db:
+            await ChunkRepository(db).delete_for_file(
+                self.file_id, from_index=self.chunk_count
+            )
+        stale = [
+            i
+            for i in await self.writer.file_ids(self.file_id)
+            if i not in self._own_ids
+        ]
+        if stale:
+            logger.info("Removing %d stale chunks of file %s", len(stale), self.file_id)
+            await self.writer.delete(stale)
+
+    async def publish(self):
+        """Make the chunks this file stored searchable.
+
+        Chunks are written with ``live`` False so retrieval skips a file
+        until it is fully ingested; call this right before marking it
+        processed.
+        """
+        ids = list(self._own_ids)
+        await self.writer.update_metadata(ids, [{"live": True}] * len(ids))
+
+    async def run(self, path: str, filename: str) -> dict:
+        """Ingest the file at ``path`` and return per-stage metrics.
+
+        Args:
+            path (str): location of the spooled upload.
+            filename (str): original file name, used to pick the loader.
+
+        Returns:
+            dict: summary of every stage, keyed by stage name.
+        """
+        return await self.run_documents(
+            iter_documents(
+                path,
+                filename,
+                registry.parse_executor(),
+                settings.INGEST_PDF_PAGES_PER_TASK,
+                prefetch=settings.INGEST_PARSE_WORKERS,
+                cache_dir=self.page_cache_dir,
+            )
+        )
+
+    async def run_documents(self, documents: DocumentSource) -> dict:
+        """Ingest documents produced by ``documents`` and return stage metrics.
+
+        Args:
+            documents (DocumentSource): yields documents with the fraction of
+                the source read so far; it is closed when the run ends.
+
+        Returns:
+            dict: summary of every stage, keyed by stage name.
+        """
+        size = settings.INGEST_PIPELINE_QUEUE_SIZE
+        pages, batches, stored = (asyncio.Queue(size) for _ in range(3))
+        workers = max(1, self.writer.concurrency)
+        start = time.perf_counter()
+        tasks = [
+            asyncio.create_task(self._load(documents, pages)),
+            asyncio.create_task(self._chunk(pages, batches, workers)),
+            *(
+                asyncio.create_task(self._embed(batches, stored))
+                for _ in range(workers)
+            ),
+            asyncio.create_task(self._store(stored, workers)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        if self._retry:
+            await self._drop_stale()
+        elapsed = time.perf_counter() - start
+        self.writer.finish(elapsed)
+        summary = {name: m.summary(elapsed) for name, m in self.metrics.items()}
+        logger.info(
+            "Pipeline for file %s finished in %.2fs: %s, db writes %s",
+            self.file_id,
+            elapsed,
+            summary,
+            self.db_writes.summary(),
+        )
+        return summary
@@ -1,22 +1,70 @@
+import asyncio
 import hashlib
+import json
+import os
+import time
 import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from concurrent.futures.process import BrokenProcessPool
+from datetime import UTC, datetime, timedelta
 
 from fastapi import status
 from fastapi.exceptions import HTTPException
+from langchain_core.documents import Document
+from pydantic import ValidationError
 
-from app.core.custom_exceptions import DuplicateFileException
-from app.core.db.chroma import get_vectorstore
+from app.core.audit_sink import audit_sink
+from app.core.config import settings
+from app.core.custom_exceptions import DuplicateFileException, FileVersionException
 from app.core.logging import get_logger
-from app.models.chunking import DocumentChunk
+from app.core.registry import registry
 from app.models.file_metadata import FileMetadata
-from app.repositories.audit_repo import AuditRepository
+from app.repositories.checkpoint_repo import CheckpointRepository
 from app.repositories.chunk_repo import ChunkRepository
 from app.repositories.file_repo import FileRepository
-from app.utils.chunking import chunk_documents
-from app.utils.file_loader import load_documents
+from app.schemas.ingest import TextRecord
+from app.services.embedding_writer import EmbeddingWriter
+from app.services.ingest_pipeline import IngestPipeline
+from app.utils.file_loader import remove_page_cache, sha256_file, touch_page_cache
+from app.utils.ndjson import iter_ndjson
+from app.utils.timing import StageTimer
 
 logger = get_logger(__name__)
 
+# Called with the current stage name and the completed fraction (0..1).
+ProgressCallback = Callable[[str, float], Awaitable[None]]
+
+# Invalid record lines reported back in full; the rest are only counted.
+MAX_REPORTED_ERRORS = 20
+
+
+def is_retryable(file: FileMetadata) -> bool:
+    """Whether ``file`` may be ingested again: it failed, or it is stuck.
+
+    A file is stuck when it is still processing but no batch of it was
+    stored for ``INGEST_STALE_AFTER`` seconds, so its ingestion died.
+    """
+    if file.status == "failed":
+        return True
+    if file.status != "processing":
+        return False
+    changed = file.updated_at or file.created_at
+    return datetime.now(UTC) - changed > timedelta(seconds=settings.INGEST_STALE_AFTER)
+
+
+def record_metadata(source: str, record: TextRecord) -> dict:
+    """Return the Chroma metadata of a text record's chunks.
+
+    Chroma only stores scalar values: nested values are kept as JSON and
+    None values are dropped. The server's keys always win over the record's.
+    """
+    metadata = {
+        key: value if isinstance(value, (str, int, float, bool)) else json.dumps(value)
+        for key, value in record.metadata.items()
+        if value is not None
+    }
+    return {**metadata, "source": source, "record_id": record.id}
+
 
 class IngestService:
     """Service responsible for ingesting files into the system.
@@ -24,8 +72,11 @@ class IngestService:
     Responsibilities:
       - compute a file hash
       - persist file metadata
-      - split documents into chunks and persist them
-      - create embeddings in the vector store
+      - stream the file through parsing, chunking, embedding and storage
+        (see ``IngestPipeline``)
+      - replace an earlier version of a file, re-embedding only what changed
+      - resume a failed file from its last committed batch
+      - import streamed text records without an intermediate file
       - audit log ingestion events
     """
 
@@ -38,106 +89,449 @@ class IngestService:
         self.db = db
         self.files = FileRepository(db)
         self.chunks = ChunkRepository(db)
-        self.audit = AuditRepository(db)
-        self.vs = get_vectorstore()
+        self.checkpoints = CheckpointRepository(db)
+        self.audit = audit_sink
 
-    async def ingest(self, file, user_id: uuid.UUID):
-        """Ingest a single uploaded file.
+    async def _release_connection(self):
+        """End the session's transaction, returning its pooled connection.
 
-        This method reads the uploaded file, calculates a SHA256 hash to
-        deduplicate, stores or updates file metadata, chunks the document,
-        creates embeddings in the vector store, and persists chunk records.
+        Nothing is pending at that point; the session opens a new transaction
+        on its next use, after the pipeline has run.
+        """
+        await self.db.commit()
 
-        Args:
-            file: an uploaded file-like object (Starlette UploadFile)
+    async def _mark_failed(self, file_meta: FileMetadata):
+        """Roll back what is pending and record that ``file_meta`` failed."""
+        await self.db.rollback()
+        file_meta.status = "failed"
+        await self.db.commit()
+
+    async def _abandon_import(self, file_meta: FileMetadata):
+        """Fail a record import, deleting what it stored.
+
+        An import cannot be resumed, so nothing is kept for a retry.
+        """
+        await self.db.rollback()
+        try:
+            await self._discard(file_meta)
+        except Exception:
+            logger.exception("Could not delete chunks of import %s", file_meta.id)
+        await self._mark_failed(file_meta)
+
+    async def _discard(self, file_meta: FileMetadata):
+        """Delete the vectors, chunks and checkpoints stored for a file.
+
+        Nothing is committed.
+        """
+        writer = EmbeddingWriter(
+            registry.embeddings(), registry.vectorstore(file_meta.user_id)
+        )
+        await writer.delete_file(file_meta.id)
+        await self.chunks.delete_for_file(file_meta.id, commit=False)
+        await self.checkpoints.delete_for_file(file_meta.id, commit=False)
+
+    async def purge_failed(self, max_age: float) -> int:
+        """Delete failed files nobody retried for ``max_age`` seconds.
+
+        Their vectors, chunks and checkpoints go with them; uploading the
+        same file again starts from scratch.
 
         Returns:
-            dict: status and file_id on success or duplicate status.
+            int: number of files deleted.
+        """
+        cutoff = datetime.now(UTC) - timedelta(seconds=max_age)
+        failed = await self.files.get_failed_before(cutoff)
+        for file_meta in failed:
+            await self._discard(file_meta)
+            await self.db.delete(file_meta)
+            await self.db.commit()
+            logger.info(
+                "Purged failed file %s of user %s", file_meta.id, file_meta.user_id
+            )
+        return len(failed)
+
+    async def _report(self, progress, stage: str, fraction: float):
+        if progress is not None:
+            await progress(stage, fraction)
+
+    async def _swap_versions(
+        self, previous: FileMetadata, file_meta: FileMetadata, pipeline
+    ) -> dict:
+        """Replace ``previous`` by the freshly ingested ``file_meta``.
+
+        Chroma is updated add-before-delete, so searches never miss content:
+        the new chunks go live, reused vectors get the new version's
+        metadata, and the old-only vectors are deleted last. The Postgres
+        side (chunk rows and both file statuses) changes in a single
+        transaction, which first locks ``previous`` and checks it is still
+        processed: if a concurrent upload replaced it meanwhile, this version
+        is discarded instead.
+
+        Returns:
+            dict: reused and removed chunk counts.
 
         Raises:
-            HTTPException: with status code 500 when ingestion fails.
+            FileVersionException: when ``previous`` is no longer processed.
         """
+        locked = await self.files.lock(previous.id)
+        if locked is None or locked.status != "processed":
+            await self._discard(file_meta)
+            await self.db.delete(file_meta)
+            await self.db.commit()
+            raise FileVersionException(
+                detail="The file was replaced by another upload meanwhile.",
+            )
+        writer = pipeline.writer
+        removed = pipeline.removed_ids
+        await pipeline.publish()
+        await writer.update_metadata(
+            list(pipeline.reused_metadata), list(pipeline.reused_metadata.values())
+        )
+        await self.chunks.delete_for_file(previous.id, commit=False)
+        previous.status = "superseded"
+        file_meta.status = "processed"
+        await self.db.commit()
         try:
-            # Create file hash
-            content = await file.read()
-            file_hash = hashlib.sha256(content).hexdigest()
-            logger.debug("File hash: %s", file_hash)
-        except Exception as e:
-            logger.exception("Error reading file: %s", e)
+            await writer.delete(removed)
+        except Exception:
+            # The new version is live; leftover vectors only waste space.
+            logger.exception(
+                "Could not delete %d chunks of superseded file %s",
+                len(removed),
+                previous.id,
+            )
+        logger.info(
+            "File %s replaced %s: %d chunks reused, %d removed",
+            file_meta.id,
+            previous.id,
+            len(pipeline.reused_metadata),
+            len(removed),
+        )
+        return {
+            "previous_file_id": str(previous.id),
+            "number": file_meta.version,
+            "reused": len(pipeline.reused_metadata),
+            "removed": len(removed),
+        }
+
+    async def ingest(
+        self,
+        path: str,
+        filename: str,
+        user_id: uuid.UUID,
+        file_hash: str | None = None,
+        progress: ProgressCallback | None = None,
+        replaces: uuid.UUID | None = None,
+    ):
+        """Ingest a single file that has been spooled to local disk.
 
+        This method uses the SHA256 hash of the file to deduplicate,
+        stores or updates file metadata, then streams the document through
+        chunking, embedding and chunk record persistence in bounded batches.
+        A file that failed before keeps the batches it stored: uploading it
+        again resumes after them, reusing its cached pages.
+
+        Args:
+            path (str): location of the spooled upload.
+            filename (str): original name of the uploaded file.
+            user_id (uuid.UUID): owner of the file.
+            file_hash (str | None): SHA256 computed while spooling; the file
+                is hashed again only when omitted.
+            progress (ProgressCallback | None): optional coroutine called with
+                the current stage name and completed fraction.
+            replaces (uuid.UUID | None): processed file of the same user that
+                this upload is a new version of. Unchanged chunks keep their
+                vectors, and the old version is superseded once this one is in.
+
+        Returns:
+            dict: status, file_id, per-stage timings and pipeline metrics on
+            success.
+
+        Raises:
+            HTTPException: 409 for duplicates or a file that cannot be
+            replaced, 500 when ingestion fails.
+        """
+        timer = StageTimer()
+        file_meta: FileMetadata | None = None
+        previous: FileMetadata | None = None
+        checkpoints: dict[int, str] | None = None
         try:
+            # Create file hash
+            await self._report(progress, "hashing", 0.0)
+            if file_hash is None:
+                with timer.measure("hash"):
+                    file_hash = await asyncio.to_thread(sha256_file, path)
             logger.info(
-                "Ingesting file %s with hash %s", file.filename, file_hash, user_id
+                "Ingesting file %s with hash %s for user %s",
+                filename,
+                file_hash,
+                user_id,
             )
             # Save file's metadata to db
-            file_meta: FileMetadata | None = await self.files.get_by_hash(
-                file_hash, user_id
-            )
+            file_meta = await self.files.get_by_hash(file_hash, user_id)
             if file_meta:
                 # Handle Failed and duplicate file
-                if file_meta.status != "failed":
-                    logger.info("Duplicate file detected for %s", file.filename)
+                if not is_retryable(file_meta):
+                    logger.info("Duplicate file detected for %s", filename)
                     raise DuplicateFileException(
                         detail="This file is already ingested. Please choose a different file.",
                     )
                 else:
                     file_meta.status = "processing"
+                    file_meta.updated_at = datetime.now(UTC)
+                    checkpoints = await self.checkpoints.get_for_file(file_meta.id)
             else:
                 file_meta = FileMetadata(
-                    filename=file.filename,
+                    filename=filename,
                     file_hash=file_hash,
                     status="processing",
                     user_id=user_id,
                 )
+            if replaces is not None:
+                previous = await self.files.get(replaces, user_id)
+                if previous is None or previous.status != "processed":
+                    raise FileVersionException(
+                        detail="Only a processed file can be replaced by a new version.",
+                    )
+                file_meta.version = previous.version + 1
+                file_meta.previous_version_id = previous.id
             await self.files.save(file_meta)
-            # Reload file stream
-            file.file.seek(0)
-            documents = load_documents(file)
-            chunks = chunk_documents(documents)
-            texts = [c.page_content for c in chunks]
-            logger.info("Total number of chunks: %d", len(chunks))
-            metadatas = [
-                {
-                    "file_id": str(file_meta.id),
-                    "user_id": str(user_id),
-                    **c.metadata,
-                }
-                for c in chunks
-            ]
-            print("metadatas", metadatas)
-            # Create embedding in chroma
-            ids = self.vs.add_texts(texts=texts, metadatas=metadatas)
-
-            chunk_rows = [
-                DocumentChunk(
-                    file_id=file_meta.id,
-                    chunk_index=i,
-                    chroma_id=ids[i],
+            previous_chunks = (
+                await self.chunks.get_for_file(previous.id) if previous else None
+            )
+            await self._release_connection()
+
+            await self._report(progress, "processing", 0.1)
+            page_cache_dir = None
+            if settings.INGEST_PAGE_CACHE_DIR:
+                page_cache_dir = os.path.join(
+                    settings.INGEST_PAGE_CACHE_DIR, str(user_id), file_hash
                 )
-                for i in range(len(ids))
-            ]
-            logger.info("Saving %d chunk rows to DB", len(chunk_rows))
-            await self.chunks.save_all(chunk_rows)
+                touch_page_cache(page_cache_dir)
+            pipeline = IngestPipeline(
+                EmbeddingWriter(registry.embeddings(), registry.vectorstore(user_id)),
+                file_meta.id,
+                user_id,
+                on_stored=lambda done: self._report(
+                    progress, "processing", 0.1 + 0.85 * done
+                ),
+                previous_file_id=replaces,
+                previous_chunks=previous_chunks,
+                checkpoints=checkpoints,
+                page_cache_dir=page_cache_dir,
+            )
+            with timer.measure("pipeline"):
+                try:
+                    stages = await pipeline.run(path, filename)
+                except BrokenProcessPool:
+                    registry.reset_parse_executor()
+                    raise
+            logger.info(
+                "Stored %d chunks, %d resumed from an earlier attempt",
+                pipeline.chunk_count,
+                pipeline.resumed_chunks,
+            )
 
-            file_meta.status = "processed"
-            await self.db.commit()
+            await self.checkpoints.delete_for_file(file_meta.id, commit=False)
+            version = None
+            if previous is not None:
+                with timer.measure("swap"):
+                    version = await self._swap_versions(previous, file_meta, pipeline)
+            else:
+                await pipeline.publish()
+                file_meta.status = "processed"
+                await self.db.commit()
+            if pipeline.page_cache_dir is not None:
+                await asyncio.to_thread(remove_page_cache, pipeline.page_cache_dir)
 
             await self.audit.log(
-                "INGEST_SUCCESS", {"file_id": str(file_meta.id)}, user_id=user_id
+                "INGEST_SUCCESS",
+                {
+                    "file_id": str(file_meta.id),
+                    "previous_version_id": str(replaces) if replaces else None,
+                },
+                user_id=user_id,
             )
-            return {"status": "ingested", "file_id": str(file_meta.id)}
+            return {
+                "status": "ingested",
+                "file_id": str(file_meta.id),
+                "timings": {
+                    **timer.summary(),
+                    "chunks": pipeline.chunk_count,
+                    "embed_retries": pipeline.writer.stats.retries,
+                    "resumed_batches": pipeline.resumed_batches,
+                    "resumed_chunks": pipeline.resumed_chunks,
+                    "db_writes": pipeline.db_writes.summary(),
+                    "pipeline": stages,
+                    "dedup": pipeline.dedup.stats() if pipeline.dedup else None,
+                    "version": version,
+                },
+            }
+        except FileVersionException as fve:
+            logger.warning("Rejected new file version: %s", fve.detail)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=fve.detail,
+            ) from fve
         except DuplicateFileException as dfe:
             logger.warning("Duplicate file ingestion attempt: %s", dfe.detail)
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=dfe.detail,
             ) from dfe
+        except asyncio.CancelledError:
+            # Shut down mid-ingestion: the file stays retryable.
+            if file_meta is not None:
+                await self._mark_failed(file_meta)
+            raise
         except Exception as e:
-            file_meta.status = "failed"  # type: ignore
-            await self.db.commit()
+            # Committed batches and their vectors stay for a retry to resume;
+            # they are not live, so searches skip them meanwhile.
+            if file_meta is not None:
+                await self._mark_failed(file_meta)
             await self.audit.log("INGEST_FAILED", {"error": str(e)}, user_id)
             logger.exception("Ingestion failed: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Ingestion failed",
             ) from e
+
+    async def _read_records(
+        self, body: AsyncIterator[bytes], source: str, stats: dict
+    ) -> AsyncIterator[tuple[list[Document], float]]:
+        """Turn an NDJSON body into batches of one document per record."""
+        digest = hashlib.sha256()
+
+        async def chunks():
+            async for chunk in body:
+                stats["bytes"] += len(chunk)
+                digest.update(chunk)
+                yield chunk
+
+        batch = []
+        async for line_no, value, error in iter_ndjson(
+            chunks(), settings.INGEST_RECORDS_MAX_LINE_BYTES
+        ):
+            if error is None:
+                try:
+                    record = TextRecord.model_validate(value)
+                except ValidationError as e:
+                    error = "; ".join(
+                        f"{'.'.join(map(str, err['loc'])) or 'record'}: {err['msg']}"
+                        for err in e.errors()
+                    )
+            if error is not None:
+                stats["invalid"] += 1
+                if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+                    stats["errors"].append(f"line {line_no}: {error}")
+                continue
+            stats["records"] += 1
+            batch.append(
+                Document(
+                    page_content=record.text, metadata=record_metadata(source, record)
+                )
+            )
+            if len(batch) >= settings.INGEST_RECORDS_BATCH_SIZE:
+                yield batch, 0.0
+                batch = []
+        stats["sha256"] = digest.hexdigest()
+        if batch:
+            yield batch, 1.0
+
+    async def import_records(
+        self, body: AsyncIterator[bytes], source: str, user_id: uuid.UUID
+    ) -> dict:
+        """Ingest a stream of NDJSON ``{id, text, metadata}`` text records.
+
+        Records are chunked and embedded in batches of
+        ``INGEST_RECORDS_BATCH_SIZE`` while the body is still arriving; only
+        the current line and the batches in the pipeline are held in memory.
+        Each import is stored as one file named ``source``. Invalid lines are
+        counted and skipped.
+
+        Args:
+            body (AsyncIterator[bytes]): the request body.
+            source (str): name of the import, stored as the file name and as
+                the ``source`` of every chunk.
+            user_id (uuid.UUID): owner of the records.
+
+        Returns:
+            dict: import statistics, see ``IngestRecordsResult``.
+
+        Raises:
+            HTTPException: 500 when the import fails.
+        """
+        timer = StageTimer()
+        stats = {"records": 0, "invalid": 0, "errors": [], "bytes": 0}
+        file_meta = FileMetadata(
+            filename=source, file_hash="", status="processing", user_id=user_id
+        )
+        # Imports have no file to deduplicate by; chunks are deduplicated.
+        file_meta.file_hash = f"records:{file_meta.id}"
+        try:
+            await self.files.save(file_meta)
+            await self._release_connection()
+            pipeline = IngestPipeline(
+                EmbeddingWriter(registry.embeddings(), registry.vectorstore(user_id)),
+                file_meta.id,
+                user_id,
+            )
+            start = time.perf_counter()
+            with timer.measure("pipeline"):
+                stages = await pipeline.run_documents(
+                    self._read_records(body, source, stats)
+                )
+            elapsed = time.perf_counter() - start
+            await pipeline.publish()
+            await self.checkpoints.delete_for_file(file_meta.id, commit=False)
+            file_meta.status = "processed"
+            await self.db.commit()
+            logger.info(
+                "Imported %d text records (%d invalid, %d bytes) as file %s: "
+                "%d chunks in %.2fs",
+                stats["records"],
+                stats["invalid"],
+                stats["bytes"],
+                file_meta.id,
+                pipeline.chunk_count,
+                elapsed,
+            )
+            await self.audit.log(
+                "INGEST_SUCCESS",
+                {
+                    "file_id": str(file_meta.id),
+                    "records": stats["records"],
+                    "sha256": stats.get("sha256"),
+                },
+                user_id=user_id,
+            )
+            return {
+                "status": "ingested",
+                "file_id": file_meta.id,
+                "records": stats["records"],
+                "invalid": stats["invalid"],
+                "errors": stats["errors"],
+                "bytes": stats["bytes"],
+                "chunks": pipeline.chunk_count,
+                "records_per_sec": (
+                    round(stats["records"] / elapsed, 1) if elapsed else 0.0
+                ),
+                "timings": {
+                    **timer.summary(),
+                    "embed_retries": pipeline.writer.stats.retries,
+                    "db_writes": pipeline.db_writes.summary(),
+                    "pipeline": stages,
+                    "dedup": pipeline.dedup.stats() if pipeline.dedup else None,
+                },
+            }
+        except asyncio.CancelledError:
+            await self._abandon_import(file_meta)
+            raise
+        except Exception as e:
+            await self._abandon_import(file_meta)
+            await self.audit.log("INGEST_FAILED", {"error": str(e)}, user_id)
+            logger.exception("Record import failed: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Record import failed",
+            ) from e
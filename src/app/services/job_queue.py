@@ -0,0 +1,351 @@
+import asyncio
+import os
+import socket
+import uuid
+from datetime import UTC, datetime
+
+from fastapi.exceptions import HTTPException
+
+from app.core.config import IngestQueueBackend, settings
+from app.core.custom_exceptions import QueueFullException
+from app.core.db.database import local_session
+from app.core.logging import get_logger
+from app.repositories.file_repo import FileRepository
+from app.repositories.job_repo import IngestJobRepository
+from app.services.ingest_service import IngestService
+from app.utils.file_loader import sweep_page_cache
+from app.utils.upload import remove_spooled
+
+logger = get_logger(__name__)
+
+
+async def run_ingest_job(job_id: uuid.UUID) -> None:
+    """Execute one queued ingestion job and record its outcome.
+
+    The job row is updated on its own session so progress commits never
+    interleave with the ingestion's transaction. The spooled upload is removed
+    once the job has finished, whatever the outcome, and so are failed files
+    left unretried for ``INGEST_PAGE_CACHE_MAX_AGE`` (see ``sweep_failed``).
+
+    Args:
+        job_id (uuid.UUID): identifier of the ``IngestJob`` to run.
+    """
+    async with local_session() as job_db:
+        jobs = IngestJobRepository(job_db)
+        job = await jobs.get(job_id)
+        if job is None:
+            logger.error("Ingest job %s not found", job_id)
+            return
+
+        async def progress(stage: str, fraction: float):
+            job.stage = stage
+            job.progress = fraction
+            await jobs.save(job)
+
+        job.status = "running"
+        job.started_at = datetime.now(UTC)
+        await jobs.save(job)
+        try:
+            async with local_session() as db:
+                result = await IngestService(db).ingest(
+                    job.spool_path,
+                    job.filename,
+                    job.user_id,
+                    file_hash=job.file_hash,
+                    progress=progress,
+                    replaces=job.replaces_file_id,
+                )
+            job.status = "succeeded"
+            job.progress = 1.0
+            job.file_id = uuid.UUID(result["file_id"])
+            job.timings = {**job.timings, **result["timings"]}
+        except HTTPException as exc:
+            job.status = "duplicate" if exc.status_code == 409 else "failed"
+            job.error = str(exc.detail)
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "Server shut down during the ingestion; upload the file again"
+            raise
+        except Exception as exc:
+            logger.exception("Ingest job %s crashed: %s", job_id, exc)
+            job.status = "failed"
+            job.error = "Ingestion failed"
+        finally:
+            job.finished_at = datetime.now(UTC)
+            await jobs.save(job)
+            await remove_spooled(job.spool_path)
+        logger.info("Ingest job %s finished with status %s", job_id, job.status)
+    await sweep_failed()
+
+
+async def sweep_failed() -> None:
+    """Delete failed files, and page caches, left alone for too long.
+
+    Both are kept so a retry can resume; after ``INGEST_PAGE_CACHE_MAX_AGE``
+    seconds without one, the pages, vectors, chunks and checkpoints go.
+    """
+    max_age = settings.INGEST_PAGE_CACHE_MAX_AGE
+    try:
+        if settings.INGEST_PAGE_CACHE_DIR:
+            swept = await asyncio.to_thread(
+                sweep_page_cache, settings.INGEST_PAGE_CACHE_DIR, max_age
+            )
+            if swept:
+                logger.info("Deleted %d stale page caches", swept)
+        async with local_session() as db:
+            await IngestService(db).purge_failed(max_age)
+    except Exception as e:
+        logger.exception("Sweeping failed ingestions failed: %s", e)
+
+
+async def abandon_ingest_jobs(job_ids: list[uuid.UUID]) -> None:
+    """Mark jobs that will never run as failed and drop their spooled files."""
+    async with local_session() as db:
+        jobs = IngestJobRepository(db)
+        for job_id in job_ids:
+            job = await jobs.get(job_id)
+            if job is None or job.status != "queued":
+                continue
+            job.status = "failed"
+            job.error = "Server shut down before the job started"
+            job.finished_at = datetime.now(UTC)
+            await jobs.save(job)
+            await remove_spooled(job.spool_path)
+
+
+async def requeue_orphaned_jobs(job_ids: list[uuid.UUID]) -> None:
+    """Reset jobs whose worker died so they can run again.
+
+    A job that was running gets its file marked failed, so the new run
+    resumes from its last committed batch instead of reporting a duplicate.
+    """
+    async with local_session() as db:
+        jobs = IngestJobRepository(db)
+        files = FileRepository(db)
+        for job_id in job_ids:
+            job = await jobs.get(job_id)
+            if job is None or job.status != "running":
+                continue
+            file = await files.get_by_hash(job.file_hash, job.user_id)
+            if file is not None and file.status == "processing":
+                file.status = "failed"
+            job.status = "queued"
+            job.stage = None
+            job.progress = 0.0
+            job.started_at = None
+            await jobs.save(job)
+
+
+class InProcessJobQueue:
+    """Bounded asyncio queue consumed by a fixed pool of worker tasks.
+
+    Workers live in the API process and are started by the FastAPI lifespan.
+    """
+
+    def __init__(self, workers: int, maxsize: int):
+        self.workers = workers
+        self._queue: asyncio.Queue[uuid.UUID] = asyncio.Queue(maxsize=maxsize)
+        self._tasks: list[asyncio.Task] = []
+        self.running = 0
+        self.processed = 0
+
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"ingest-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the worker tasks and fail their jobs and those never started."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        if pending:
+            logger.warning("Abandoning %d queued ingest jobs", len(pending))
+            await abandon_ingest_jobs(pending)
+
+    async def enqueue(self, job_id: uuid.UUID) -> None:
+        """Queue a job without waiting.
+
+        Raises:
+            QueueFullException: when the queue is at capacity.
+        """
+        try:
+            self._queue.put_nowait(job_id)
+        except asyncio.QueueFull as e:
+            raise QueueFullException(detail="Ingestion queue is full") from e
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self.running += 1
+            try:
+                await run_ingest_job(job_id)
+            except Exception as e:
+                logger.exception("Ingest worker failed on job %s: %s", job_id, e)
+            finally:
+                self.running -= 1
+                self.processed += 1
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        """Return queue depth and worker usage."""
+        return {
+            "backend": IngestQueueBackend.IN_PROCESS.value,
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "running": self.running,
+            "processed": self.processed,
+        }
+
+
+class RedisJobQueue:
+    """Job queue backed by a Redis list shared by API and worker processes.
+
+    The API process only produces; separate processes started with
+    ``run_worker.py`` consume and run the jobs, so ingestion scales
+    independently of the API. The spool directory must be shared storage.
+
+    A worker atomically moves each job it takes to its own processing list
+    and refreshes a heartbeat key while it runs. When a worker starts, jobs
+    left in the processing list of a worker whose heartbeat expired (it
+    died) are queued again. Requires the optional ``redis`` package and
+    Redis 6.2 or later.
+    """
+
+    def __init__(self, workers: int, maxsize: int):
+        self.workers = workers
+        self.maxsize = maxsize
+        self._redis = None
+        self._tasks: list[asyncio.Task] = []
+        self.running = 0
+        self.processed = 0
+        self.recovered = 0
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        self._processing = self._processing_list(worker)
+        self._heartbeat = self._heartbeat_key(worker)
+
+    @staticmethod
+    def _processing_list(worker: str) -> str:
+        return f"{settings.REDIS_QUEUE_NAME}:processing:{worker}"
+
+    @staticmethod
+    def _heartbeat_key(worker: str) -> str:
+        return f"{settings.REDIS_QUEUE_NAME}:worker:{worker}"
+
+    async def start(self) -> None:
+        """Connect to Redis."""
+        try:
+            from redis.asyncio import Redis
+        except ImportError as e:
+            raise RuntimeError(
+                "INGEST_QUEUE_BACKEND=redis requires the 'redis' package"
+            ) from e
+        self._redis = Redis.from_url(settings.REDIS_QUEUE_URL)
+
+    async def stop(self) -> None:
+        """Stop consuming and close the Redis connection.
+
+        Running jobs are cancelled and marked failed; their files can be
+        uploaded again.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._redis is not None:
+            await self._redis.delete(self._heartbeat)
+            await self._redis.aclose()
+            self._redis = None
+
+    async def enqueue(self, job_id: uuid.UUID) -> None:
+        """Push a job id onto the shared list.
+
+        Raises:
+            QueueFullException: when the list already holds ``maxsize`` jobs.
+        """
+        if await self._redis.llen(settings.REDIS_QUEUE_NAME) >= self.maxsize:
+            raise QueueFullException(detail="Ingestion queue is full")
+        await self._redis.lpush(settings.REDIS_QUEUE_NAME, str(job_id))
+
+    async def run_workers(self) -> None:
+        """Consume jobs with ``workers`` concurrent tasks until cancelled."""
+        ttl = settings.REDIS_WORKER_HEARTBEAT_TTL
+        await self._redis.set(self._heartbeat, 1, ex=ttl)
+        self._tasks = [asyncio.create_task(self._beat(ttl), name="ingest-heartbeat")]
+        await self._recover()
+        self._tasks += [
+            asyncio.create_task(self._work(), name=f"ingest-worker-{i}")
+            for i in range(self.workers)
+        ]
+        await asyncio.gather(*self._tasks)
+
+    async def _beat(self, ttl: int) -> None:
+        while True:
+            await asyncio.sleep(ttl / 3)
+            await self._redis.set(self._heartbeat, 1, ex=ttl)
+
+    async def _recover(self) -> None:
+        """Queue again the jobs of workers that died while running them."""
+        prefix = self._processing_list("")
+        async for key in self._redis.scan_iter(match=f"{prefix}*"):
+            key = key.decode()
+            if key == self._processing or await self._redis.exists(
+                self._heartbeat_key(key.removeprefix(prefix))
+            ):
+                continue
+            # Claim each job first, so two starting workers never both take it.
+            while item := await self._redis.lmove(
+                key, self._processing, "RIGHT", "LEFT"
+            ):
+                job_id = uuid.UUID(item.decode())
+                await requeue_orphaned_jobs([job_id])
+                async with self._redis.pipeline(transaction=True) as pipe:
+                    pipe.lrem(self._processing, 1, item)
+                    pipe.rpush(settings.REDIS_QUEUE_NAME, item)
+                    await pipe.execute()
+                self.recovered += 1
+                logger.warning("Requeued ingest job %s of a dead worker", job_id)
+
+    async def _work(self) -> None:
+        while True:
+            item = await self._redis.blmove(
+                settings.REDIS_QUEUE_NAME, self._processing, 5, "RIGHT", "LEFT"
+            )
+            if item is None:
+                continue
+            job_id = uuid.UUID(item.decode())
+            self.running += 1
+            try:
+                await run_ingest_job(job_id)
+            except Exception as e:
+                logger.exception("Ingest worker failed on job %s: %s", job_id, e)
+            finally:
+                self.running -= 1
+                self.processed += 1
+                await self._redis.lrem(self._processing, 1, item)
+
+    def stats(self) -> dict:
+        """Return local worker usage (queue depth lives in Redis)."""
+        return {
+            "backend": IngestQueueBackend.REDIS.value,
+            "workers": self.workers,
+            "running": self.running,
+            "processed": self.processed,
+            "recovered": self.recovered,
+        }
+
+
+def get_job_queue():
+    """Build the job queue for the configured backend."""
+    if settings.INGEST_QUEUE_BACKEND == IngestQueueBackend.REDIS:
+        return RedisJobQueue(settings.INGEST_WORKERS, settings.INGEST_QUEUE_MAXSIZE)
+    return InProcessJobQueue(settings.INGEST_WORKERS, settings.INGEST_QUEUE_MAXSIZE)
+
+
+job_queue = get_job_queue()
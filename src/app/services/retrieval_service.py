@@ -1,6 +1,21 @@
+import asyncio
+import functools
 import uuid
 
-from app.core.db.chroma import get_vectorstore
+from app.core.config import settings
+from app.core.registry import registry
+from app.utils.timing import StageTimer
+
+# Bounds the number of in-flight retrievals per worker process.
+_retrieval_slots = asyncio.Semaphore(settings.RETRIEVAL_MAX_CONCURRENCY)
+
+
+def _search_filter(user_id: uuid.UUID) -> dict:
+    """Match the user's chunks, except those of files not fully ingested.
+
+    Chunks stored before the ``live`` flag existed have no such key and match.
+    """
+    return {"$and": [{"user_id": str(user_id)}, {"live": {"$ne": False}}]}
 
 
 class RetrievalService:
@@ -9,7 +24,7 @@ class RetrievalService:
 
         By default the retriever is configured to return the top-k candidates.
         """
-        self.vectorstore = get_vectorstore()
+        self.embeddings = registry.embeddings()
 
     def retrieve(self, query: str, user_id: uuid.UUID):
         """Run a similarity search against the vector store.
@@ -20,12 +35,64 @@ class RetrievalService:
         Returns:
             List[Document]: documents returned by the retriever.
         """
-        retriever = get_vectorstore().as_retriever(
+        retriever = registry.vectorstore(user_id).as_retriever(
             search_kwargs={
-                "k": 4,
-                "filter": {
-                    "user_id": str(user_id),
-                },
+                "k": settings.TOP_K,
+                "filter": _search_filter(user_id),
             }
         )
         return retriever.invoke(query)
+
+    async def aretrieve(
+        self, query: str, user_id: uuid.UUID, timer: StageTimer | None = None
+    ):
+        """Run a similarity search without blocking the event loop.
+
+        Args:
+            query (str): the user query used to retrieve relevant documents.
+            user_id (uuid.UUID): owner whose documents are searched.
+            timer (StageTimer | None): optional timer receiving the ``embed``
+                and ``vector_search`` step durations.
+
+        Returns:
+            List[Document]: documents returned by the similarity search.
+        """
+        _, docs = await self.aretrieve_with_vector(query, user_id, timer=timer)
+        return docs
+
+    async def aretrieve_with_vector(
+        self, query: str, user_id: uuid.UUID, timer: StageTimer | None = None
+    ):
+        """Embed ``query`` and run a similarity search without blocking the loop.
+
+        The query is embedded with the client's native async API; only the
+        blocking Chroma query is offloaded to the registry's search executor.
+        Concurrency is bounded by ``RETRIEVAL_MAX_CONCURRENCY``.
+
+        Args:
+            query (str): the user query used to retrieve relevant documents.
+            user_id (uuid.UUID): owner whose documents are searched.
+            timer (StageTimer | None): optional timer receiving the ``embed``
+                and ``vector_search`` step durations.
+
+        Returns:
+            tuple[list[float], List[Document]]: the query embedding and the
+            documents returned by the similarity search.
+        """
+        timer = timer or StageTimer()
+        vectorstore = registry.vectorstore(user_id)
+        async with _retrieval_slots:
+            with timer.measure("embed"):
+                embedding = await self.embeddings.aembed_query(query)
+            loop = asyncio.get_running_loop()
+            with timer.measure("vector_search"):
+                docs = await loop.run_in_executor(
+                    registry.search_executor(),
+                    functools.partial(
+                        vectorstore.similarity_search_by_vector,
+                        embedding,
+                        k=settings.TOP_K,
+                        filter=_search_filter(user_id),
+                    ),
+                )
+        return embedding, docs
@@ -1,8 +1,8 @@
 from fastapi.exceptions import HTTPException
 
+from app.core.audit_sink import audit_sink
 from app.core.logging import get_logger
 from app.models.user import User
-from app.repositories.audit_repo import AuditRepository
 from app.repositories.user_repo import UserRepository
 from app.utils.crypt import hash_password, verify_password
 
@@ -26,7 +26,7 @@ class UserService:
         """
         self.db = db
         self.users = UserRepository(db)
-        self.audit = AuditRepository(db)
+        self.audit = audit_sink
 
     async def register_user(
         self,
@@ -1,13 +1,26 @@
+import threading
+from collections import Counter
+
 from langchain_classic.chains.combine_documents import create_stuff_documents_chain
 from langchain_classic.prompts import ChatPromptTemplate
 
-from app.core.llm import openai_llm
+from app.core.config import settings
+from app.core.llm import http_pool_stats, openai_llm
 
 
-def build_streaming_chain():
+def build_streaming_chain(
+    model_name: str = settings.LLM_MODEL,
+    temperature: float = 0.2,
+    streaming: bool = True,
+):
     """Build and return a streaming chain configured with system prompt.
 
     The returned chain is suitable for streaming token-by-token responses.
+
+    Args:
+        model_name (str): model identifier.
+        temperature (float): sampling temperature.
+        streaming (bool): whether to enable streaming responses.
     """
     prompt = ChatPromptTemplate.from_messages(
         [
@@ -33,6 +46,62 @@ def build_streaming_chain():
             ("human", "{input}"),
         ]
     )
-    openai_llm_instance = openai_llm()
+    openai_llm_instance = openai_llm(
+        model_name=model_name, temperature=temperature, streaming=streaming
+    )
 
     return create_stuff_documents_chain(openai_llm_instance, prompt)
+
+
+class ChainPool:
+    """Pool of long-lived compiled chains keyed by (model, temperature, streaming).
+
+    Chains are stateless runnables, so a single instance per key is shared by
+    all requests. The underlying LLM clients share one HTTP connection pool
+    (see ``app.core.llm.shared_http_clients``).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chains = {}
+        self._uses = Counter()
+        self._builds = 0
+
+    def get(
+        self,
+        model_name: str = settings.LLM_MODEL,
+        temperature: float = 0.2,
+        streaming: bool = True,
+    ):
+        """Return the pooled chain for the given parameters, building it once."""
+        key = (model_name, float(temperature), bool(streaming))
+        chain = self._chains.get(key)
+        if chain is None:
+            with self._lock:
+                chain = self._chains.get(key)
+                if chain is None:
+                    chain = build_streaming_chain(*key)
+                    self._chains[key] = chain
+                    self._builds += 1
+        self._uses[key] += 1
+        return chain
+
+    def clear(self) -> None:
+        """Drop all pooled chains."""
+        with self._lock:
+            self._chains.clear()
+
+    def stats(self) -> dict:
+        """Return pool size, build count, per-key usage and HTTP pool usage."""
+        return {
+            "chains": len(self._chains),
+            "builds": self._builds,
+            "uses": {
+                f"{model}|{temperature}|{streaming}": count
+                for (model, temperature, streaming), count in self._uses.items()
+            },
+            "http": http_pool_stats(),
+        }
+
+
+chain_pool = ChainPool()
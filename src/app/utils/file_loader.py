@@ -1,33 +1,287 @@
-import tempfile
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from concurrent.futures import Executor
+from datetime import datetime
 
-from fastapi import UploadFile
 from langchain_community.document_loaders import Docx2txtLoader, PyPDFLoader, TextLoader
+from langchain_core.documents import Document
+from pypdf import PdfReader
 
+HASH_CHUNK_SIZE = 1024 * 1024
 
-def load_documents(upload_file: UploadFile):
-    """Load documents from an uploaded file into LangChain document objects.
+
+def sha256_file(path: str) -> str:
+    """Compute the hex SHA256 of a file without loading it fully in memory.
+
+    Args:
+        path (str): location of the file.
+
+    Returns:
+        str: hex-encoded SHA256 digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_documents(path: str, filename: str):
+    """Load documents from a file on disk into LangChain document objects.
 
     Supports PDF, TXT/MD, and DOCX file types.
 
     Args:
-        upload_file (UploadFile): a Starlette/FastAPI UploadFile instance.
+        path (str): location of the file to parse.
+        filename (str): original file name, used to pick the loader.
 
     Returns:
         List[Document]: documents loaded by the appropriate loader.
     """
-    suffix = upload_file.filename.split(".")[-1].lower()
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{suffix}") as tmp:
-        tmp.write(upload_file.file.read())
-        tmp_path = tmp.name
+    suffix = filename.split(".")[-1].lower()
 
     if suffix == "pdf":
-        loader = PyPDFLoader(tmp_path)
+        loader = PyPDFLoader(path)
     elif suffix in {"txt", "md"}:
-        loader = TextLoader(tmp_path)
+        loader = TextLoader(path)
     elif suffix in {"docx"}:
-        loader = Docx2txtLoader(tmp_path)
+        loader = Docx2txtLoader(path)
     else:
         raise ValueError(f"Unsupported file type: {suffix}")
     # TODO capability to add metadata
     return loader.load()
+
+
+def load_cached(cache_path: str | None, loader, *args) -> list[Document]:
+    """Run ``loader(*args)``, reusing the documents it saved at ``cache_path``.
+
+    The result is written as JSON next to the cache path and renamed into
+    place, so a crash never leaves a truncated cache file behind.
+
+    Args:
+        cache_path (str | None): cache file; caching is off when None.
+        loader: top-level function returning a list of documents.
+        *args: arguments passed to ``loader``.
+
+    Returns:
+        List[Document]: the cached or freshly loaded documents.
+    """
+    if cache_path is None:
+        return loader(*args)
+    try:
+        with open(cache_path, encoding="utf-8") as fh:
+            return [Document(**d) for d in json.load(fh)]
+    except FileNotFoundError:
+        pass
+    documents = loader(*args)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(
+            [
+                {"page_content": d.page_content, "metadata": d.metadata}
+                for d in documents
+            ],
+            fh,
+        )
+    os.replace(tmp_path, cache_path)
+    return documents
+
+
+def remove_page_cache(cache_dir: str) -> None:
+    """Delete the pages cached for a file once it no longer needs them."""
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def touch_page_cache(cache_dir: str) -> None:
+    """Mark a file's cached pages as in use so ``sweep_page_cache`` keeps them."""
+    try:
+        os.utime(cache_dir)
+    except FileNotFoundError:
+        pass
+
+
+def sweep_page_cache(cache_root: str, max_age: float) -> int:
+    """Delete the page caches left untouched for more than ``max_age`` seconds.
+
+    Pages of a failed file are kept so a retry skips parsing; this removes
+    those of files nobody retried.
+
+    Args:
+        cache_root (str): directory holding one folder per user, each with one
+            page cache per file hash.
+        max_age (float): age in seconds after which a cache is deleted.
+
+    Returns:
+        int: number of caches deleted.
+    """
+    cutoff = time.time() - max_age
+    try:
+        users = [entry for entry in os.scandir(cache_root) if entry.is_dir()]
+    except FileNotFoundError:
+        return 0
+    removed = 0
+    for user in users:
+        try:
+            entries = list(os.scandir(user.path))
+        except FileNotFoundError:
+            continue
+        if entries and not any(entry.is_dir() for entry in entries):
+            # Cache written before pages were kept per user.
+            entries = [user]
+        for entry in entries:
+            try:
+                stale = entry.is_dir() and entry.stat().st_mtime < cutoff
+            except FileNotFoundError:
+                continue
+            if stale:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+    return removed
+
+
+def prime_parse_worker() -> None:
+    """No-op run in new parse workers so they import the loaders up front."""
+
+
+def _pdf_metadata(metadata: dict) -> dict:
+    """Normalize PDF document info the way ``PyPDFLoader`` does.
+
+    Keys lose their leading slash and are lowercased, values become strings
+    or ints, dates become ISO 8601, and ``total_pages``/``source`` are mirrored
+    from ``page_count``/``file_path``.
+    """
+    normalized = {}
+    aliases = {"page_count": "total_pages", "file_path": "source"}
+    for key, value in metadata.items():
+        if type(value) not in (str, int):
+            value = str(value)
+        key = key.removeprefix("/").lower()
+        if key in ("creationdate", "moddate"):
+            try:
+                normalized[key] = datetime.strptime(
+                    value.replace("'", ""), "D:%Y%m%d%H%M%S%z"
+                ).isoformat("T")
+            except ValueError:
+                normalized[key] = value
+        elif key in aliases:
+            normalized[aliases[key]] = value
+            normalized[key] = value
+        elif isinstance(value, str):
+            normalized[key] = value.strip()
+        else:
+            normalized[key] = value
+    return normalized
+
+
+def pdf_page_labels(path: str) -> list[str]:
+    """Return the label of every page of the PDF at ``path``, in page order."""
+    return PdfReader(path).page_labels
+
+
+def load_pdf_pages(
+    path: str, start: int, stop: int, page_labels: list[str]
+) -> list[Document]:
+    """Load pages ``start`` to ``stop`` (exclusive) of a PDF.
+
+    Produces the same content and metadata as ``PyPDFLoader`` does for those
+    pages, so ranges loaded separately can simply be concatenated. Labels are
+    passed in because pypdf only computes them for the whole document.
+
+    Args:
+        path (str): location of the PDF.
+        start (int): index of the first page to load.
+        stop (int): index after the last page to load.
+        page_labels (list[str]): labels of the pages ``start`` to ``stop``.
+
+    Returns:
+        List[Document]: one document per page, in page order.
+    """
+    reader = PdfReader(path)
+    doc_metadata = _pdf_metadata(
+        {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""}
+        | dict(reader.metadata or {})
+        | {"source": path, "total_pages": len(reader.pages)}
+    )
+    return [
+        Document(
+            page_content=reader.pages[i].extract_text(extraction_mode="plain").strip(),
+            metadata=doc_metadata | {"page": i, "page_label": page_labels[i - start]},
+        )
+        for i in range(start, min(stop, len(reader.pages)))
+    ]
+
+
+async def iter_documents(
+    path: str,
+    filename: str,
+    executor: Executor,
+    pages_per_task: int,
+    prefetch: int,
+    cache_dir: str | None = None,
+) -> AsyncIterator[tuple[list[Document], float]]:
+    """Parse a file in ``executor`` and yield its documents in batches.
+
+    PDFs are loaded as ranges of ``pages_per_task`` pages, with at most
+    ``prefetch`` ranges in flight; ranges are yielded in page order, so a
+    slow consumer holds back parsing instead of letting pages pile up.
+    Every other file is loaded by a single ``load_documents`` call. With a
+    ``cache_dir``, each parsed range is saved there and reused by later calls.
+
+    Args:
+        path (str): location of the file to parse.
+        filename (str): original file name, used to pick the loader.
+        executor (Executor): pool running the loaders, normally a process pool.
+        pages_per_task (int): maximum number of PDF pages parsed per task.
+        prefetch (int): maximum number of page ranges parsed ahead.
+        cache_dir (str | None): directory caching the parsed pages of this
+            file, normally keyed by its hash.
+
+    Yields:
+        tuple[list[Document], float]: the next documents and the fraction of
+        the file parsed so far.
+    """
+
+    def cache_path(name: str) -> str | None:
+        return os.path.join(cache_dir, f"{name}.json") if cache_dir else None
+
+    loop = asyncio.get_running_loop()
+    if filename.split(".")[-1].lower() != "pdf":
+        documents = await loop.run_in_executor(
+            executor, load_cached, cache_path("all"), load_documents, path, filename
+        )
+        yield documents, 1.0
+        return
+
+    page_labels = await loop.run_in_executor(executor, pdf_page_labels, path)
+    pages = len(page_labels)
+    starts = iter(range(0, pages, pages_per_task))
+    pending: deque[tuple[int, asyncio.Future]] = deque()
+    try:
+        while True:
+            while len(pending) < prefetch and (start := next(starts, None)) is not None:
+                stop = min(start + pages_per_task, pages)
+                future = loop.run_in_executor(
+                    executor,
+                    load_cached,
+                    cache_path(f"{start}-{stop}"),
+                    load_pdf_pages,
+                    path,
+                    start,
+                    stop,
+                    page_labels[start:stop],
+                )
+                pending.append((stop, future))
+            if not pending:
+                return
+            stop, future = pending.popleft()
+            yield await future, stop / pages
+    finally:
+        for _, future in pending:
+            future.cancel()
@@ -0,0 +1,82 @@
+import re
+from collections import defaultdict
+
+import mmh3
+import numpy as np
+
+# Mersenne prime 2^61 - 1 for the (a * x + b) mod p permutation family.
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int) -> set[str]:
+    """Return the word ``size``-grams of ``text``, ignoring case and punctuation."""
+    words = _WORD.findall(text.casefold())
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """Compute MinHash signatures of texts.
+
+    Each shingle is hashed once with 32-bit murmur3; the ``num_perm``
+    permutations are random linear maps applied with numpy, so the cost is
+    one vectorized pass per text instead of ``num_perm`` hashes per shingle.
+    """
+
+    def __init__(self, num_perm: int, shingle_size: int, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.randint(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Return the uint32 MinHash signature of ``text``."""
+        hashes = np.fromiter(
+            (mmh3.hash(s, signed=False) for s in shingles(text, self.shingle_size)),
+            dtype=np.uint64,
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimate the Jaccard similarity of two texts from their signatures."""
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+def band_keys(signature: np.ndarray, bands: int) -> list[int]:
+    """Return one signed 64-bit LSH key per band of ``signature``.
+
+    Texts whose signatures share any key are candidate near-duplicates; the
+    band index seeds the hash so equal rows in different bands never collide.
+    """
+    rows = len(signature) // bands
+    return [
+        mmh3.hash64(signature[i * rows : (i + 1) * rows].tobytes(), seed=i)[0]
+        for i in range(bands)
+    ]
+
+
+class MinHashLSH:
+    """In-memory LSH index of MinHash signatures."""
+
+    def __init__(self, bands: int):
+        self.bands = bands
+        self._buckets: dict[int, list[int]] = defaultdict(list)
+        self._signatures: list[np.ndarray] = []
+
+    def candidates(self, keys: list[int]) -> list[np.ndarray]:
+        """Return the indexed signatures sharing a band key with ``keys``."""
+        found = {i for key in keys for i in self._buckets.get(key, ())}
+        return [self._signatures[i] for i in found]
+
+    def add(self, signature: np.ndarray, keys: list[int]) -> None:
+        """Index ``signature`` under its band ``keys``."""
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for key in keys:
+            self._buckets[key].append(index)
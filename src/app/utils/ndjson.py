@@ -0,0 +1,56 @@
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+
+async def iter_ndjson(
+    chunks: AsyncIterator[bytes], max_line_bytes: int
+) -> AsyncIterator[tuple[int, Any, str | None]]:
+    """Parse newline-delimited JSON from a byte stream, one line at a time.
+
+    Only the current line is buffered. A line longer than ``max_line_bytes``
+    is skipped up to its newline and reported as an error, as is a line that
+    is not valid JSON; blank lines are ignored.
+
+    Args:
+        chunks (AsyncIterator[bytes]): the raw body, in arbitrary pieces.
+        max_line_bytes (int): longest line accepted.
+
+    Yields:
+        tuple[int, Any, Optional[str]]: 1-based line number, parsed value
+        and None, or line number, None and an error message.
+    """
+    buffer = bytearray()
+    line_no = 0
+    # Set while discarding the rest of an over-long line.
+    skipping = False
+
+    def parse(line: bytes):
+        try:
+            return line_no, json.loads(line), None
+        except ValueError as e:
+            return line_no, None, f"invalid JSON: {e}"
+
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            line_no += 1
+            if skipping:
+                skipping = False
+                yield line_no, None, f"line longer than {max_line_bytes} bytes"
+            else:
+                buffer += chunk[start:end]
+                if buffer.strip():
+                    yield parse(bytes(buffer))
+            buffer.clear()
+            start = end + 1
+        if not skipping:
+            buffer += chunk[start:]
+            if len(buffer) > max_line_bytes:
+                skipping = True
+                buffer.clear()
+    if skipping:
+        yield line_no + 1, None, f"line longer than {max_line_bytes} bytes"
+    elif buffer.strip():
+        line_no += 1
+        yield parse(bytes(buffer))
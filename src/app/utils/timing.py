@@ -0,0 +1,86 @@
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """Collect wall-clock durations of named steps of a processing stage.
+
+    Steps may overlap (e.g. when run with ``asyncio.gather``); ``summary``
+    reports each step next to the stage's total so the critical path is visible.
+    """
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self.timings: dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, name: str):
+        """Time the enclosed block (which may contain awaits) as step ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    async def run(self, name: str, awaitable):
+        """Await ``awaitable`` and record its duration as step ``name``."""
+        with self.measure(name):
+            return await awaitable
+
+    def summary(self) -> dict[str, float]:
+        """Return step durations and the elapsed total, in milliseconds."""
+        result = {name: round(sec * 1000, 1) for name, sec in self.timings.items()}
+        result["total"] = round((time.perf_counter() - self._start) * 1000, 1)
+        return result
+
+
+class StageMetrics:
+    """Throughput and input queue depth of one stage of a streaming pipeline.
+
+    ``busy_seconds`` only counts time spent working on items, not time spent
+    waiting for input or for room in the next stage's queue.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+
+    def observe_queue(self, depth: int) -> None:
+        """Record the depth of the stage's input queue when taking an item."""
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self._depth_total += depth
+        self._depth_samples += 1
+
+    @contextmanager
+    def busy(self):
+        """Add the duration of the enclosed block to the stage's busy time."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.busy_seconds += time.perf_counter() - start
+
+    def count(self, items: int) -> None:
+        """Record one processed batch of ``items`` items."""
+        self.items += items
+        self.batches += 1
+
+    def summary(self, elapsed: float) -> dict:
+        """Return counters and rates, given the pipeline's wall time in seconds."""
+        return {
+            "items": self.items,
+            "batches": self.batches,
+            "busy_ms": round(self.busy_seconds * 1000, 1),
+            "items_per_sec": round(self.items / elapsed, 1) if elapsed else 0.0,
+            "max_queue_depth": self.max_queue_depth,
+            "avg_queue_depth": (
+                round(self._depth_total / self._depth_samples, 2)
+                if self._depth_samples
+                else 0.0
+            ),
+        }
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class SpooledUpload:
+    path: str
+    file_hash: str
+    size: int
+    seconds: float
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.size / self.seconds if self.seconds else 0.0
+
+
+async def spool_upload(upload_file: UploadFile, directory: str) -> SpooledUpload:
+    """Stream an upload to ``directory`` once, hashing it on the way.
+
+    The upload is read in fixed-size chunks, so memory stays flat regardless
+    of the file size. The partial file is removed if spooling fails.
+
+    Args:
+        upload_file (UploadFile): a Starlette/FastAPI UploadFile instance.
+        directory (str): spool directory, created if missing.
+
+    Returns:
+        SpooledUpload: path, SHA256, size and throughput of the spooled copy;
+        the caller owns the file and must delete it (see ``remove_spooled``).
+    """
+    await aiofiles.os.makedirs(directory, exist_ok=True)
+    suffix = os.path.splitext(upload_file.filename or "")[1].lower()
+    fd, path = tempfile.mkstemp(dir=directory, suffix=suffix)
+    os.close(fd)
+
+    digest = hashlib.sha256()
+    size = 0
+    start = time.perf_counter()
+    try:
+        async with aiofiles.open(path, "wb") as out:
+            while chunk := await upload_file.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+                await out.write(chunk)
+    except BaseException:
+        await remove_spooled(path)
+        raise
+
+    spooled = SpooledUpload(
+        path=path,
+        file_hash=digest.hexdigest(),
+        size=size,
+        seconds=time.perf_counter() - start,
+    )
+    logger.info(
+        "Spooled %s: %d bytes in %.3fs (%.1f MB/s)",
+        upload_file.filename,
+        spooled.size,
+        spooled.seconds,
+        spooled.bytes_per_second / (1024 * 1024),
+    )
+    return spooled
+
+
+async def remove_spooled(path: str) -> None:
+    """Delete a spooled upload, ignoring files that are already gone."""
+    try:
+        await aiofiles.os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -1,9 +1,14 @@
+import hashlib
+import json
 import os
+from contextlib import ExitStack
 
 import gradio as gr
 import requests
 
 BASE_URL = "http://localhost:9000"
+# Keeps the connection to the backend open between uploads.
+http = requests.Session()
 
 
 # Login
@@ -84,28 +89,82 @@ def api_register(name, username, email, password):
 
 
 # Ingest Logic
+def sha256_of(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file_obj:
+        for block in iter(lambda: file_obj.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def files_to_upload(file_list, headers):
+    """
+    Asks /api/v1/ingest/precheck which files the backend does not have yet.
+    Returns: the paths to upload, and the paths already ingested
+    """
+    digests = [{"sha256": sha256_of(f), "size": os.path.getsize(f)} for f in file_list]
+    response = http.post(
+        f"{BASE_URL}/api/v1/ingest/precheck",
+        json={"files": digests},
+        headers=headers,
+    )
+    response.raise_for_status()
+    answers = response.json()["files"]
+    needed = [f for f, a in zip(file_list, answers) if a["needed"]]
+    skipped = [f for f, a in zip(file_list, answers) if not a["needed"]]
+    return needed, skipped
+
+
 def ingest_file(file_list, token):
+    """
+    Uploads the selected files the backend does not have yet in one
+    /api/v1/ingest/batch request.
+    Yields: the status text, updated as each file finishes
+    """
     if not token:
-        return "⚠️ Authentication Error: Please log in again."
-    api_url = f"{BASE_URL}/api/v1/ingest"
+        yield "⚠️ Authentication Error: Please log in again."
+        return
+    api_url = f"{BASE_URL}/api/v1/ingest/batch"
     if not file_list:
-        return "No file selected."
+        yield "No file selected."
+        return
 
     headers = {"Authorization": f"Bearer {token}"}
     responses = []
-    for f in file_list:
-        filename = os.path.basename(f)
-        try:
-            with open(f, "rb") as file_obj:
-                files = {"file": file_obj}
-                response = requests.post(api_url, files=files, headers=headers)
-            if response.status_code == 200:
-                responses.append(f"{filename}: ✅ Success")
-            else:
-                responses.append(f"{filename}: ❌ Error: {response.text}")
-        except Exception as e:
-            responses.append(f"{filename}: ❌ System Error: {str(e)}")
-    return "\n".join(responses)
+    try:
+        needed, skipped = files_to_upload(file_list, headers)
+        for f in skipped:
+            responses.append(f"{os.path.basename(f)}: ⏭️ Already ingested")
+        if not needed:
+            yield "\n".join(responses)
+            return
+        with ExitStack() as stack:
+            files = [
+                ("files", (os.path.basename(f), stack.enter_context(open(f, "rb"))))
+                for f in needed
+            ]
+            with http.post(
+                api_url, files=files, headers=headers, stream=True
+            ) as response:
+                if response.status_code != 200:
+                    yield f"❌ Error: {response.text}"
+                    return
+                yield "\n".join(responses + [f"⏳ Ingesting {len(files)} files..."])
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line:
+                        continue
+                    result = json.loads(line)
+                    filename = result.get("filename", "?")
+                    if result["status"] == "succeeded":
+                        responses.append(f"{filename}: ✅ Success")
+                    elif result["status"] == "timeout":
+                        responses.append(f"{filename}: ⏳ {result.get('error')}")
+                    else:
+                        responses.append(f"{filename}: ❌ Error: {result.get('error')}")
+                    yield "\n".join(responses)
+    except Exception as e:
+        responses.append(f"❌ System Error: {str(e)}")
+        yield "\n".join(responses)
 
 
 # Chat logic to read stream response and show in gradio
@@ -0,0 +1,42 @@
+import asyncio
+
+from app.core.audit_sink import audit_sink
+from app.core.config import IngestQueueBackend, settings
+from app.core.db.database import async_engine
+from app.core.db.pool import log_pool_stats
+from app.core.logging import setup_logging
+from app.core.registry import registry
+from app.services.job_queue import job_queue
+
+"""
+This script runs a standalone ingestion worker. It consumes jobs queued by the
+API through the Redis backend (INGEST_QUEUE_BACKEND=redis), so ingestion can be
+scaled independently of the API processes.
+"""
+
+
+async def main():
+    await asyncio.to_thread(registry.warmup)
+    await audit_sink.start()
+    await job_queue.start()
+    pool_stats_logger = None
+    if settings.DB_POOL_STATS_LOG_INTERVAL > 0:
+        pool_stats_logger = asyncio.create_task(
+            log_pool_stats(async_engine, settings.DB_POOL_STATS_LOG_INTERVAL)
+        )
+    try:
+        await job_queue.run_workers()
+    finally:
+        if pool_stats_logger is not None:
+            pool_stats_logger.cancel()
+            await asyncio.gather(pool_stats_logger, return_exceptions=True)
+        await job_queue.stop()
+        await audit_sink.stop()
+        registry.close()
+
+
+if __name__ == "__main__":
+    setup_logging(log_level="INFO")
+    if settings.INGEST_QUEUE_BACKEND != IngestQueueBackend.REDIS:
+        raise SystemExit("run_worker.py requires INGEST_QUEUE_BACKEND=redis")
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+import uuid
+
+import pytest
+from langchain_core.documents import Document
+
+from app.core.answer_cache import AnswerCache
+from app.models.chat import ChatMessage
+from app.services import chat_service
+from app.services.chat_service import ChatService
+
+QUERY_VECTOR = [1.0, 0.0, 0.0]
+DOCS = [Document(id="chunk-1", page_content="context")]
+
+
+class FakeRetrieval:
+    async def aretrieve_with_vector(self, query, user_id, timer=None):
+        return QUERY_VECTOR, DOCS
+
+
+class FakeChain:
+    def __init__(self, answer: str):
+        self.answer = answer
+        self.calls = 0
+
+    async def astream(self, inputs):
+        self.calls += 1
+        yield self.answer
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = AnswerCache(0.95, 16, 16, 60)
+    monkeypatch.setattr(chat_service, "answer_cache", cache)
+    monkeypatch.setattr(chat_service.write_behind, "add", _noop)
+    monkeypatch.setattr(chat_service.audit_sink, "log", _noop)
+    return cache
+
+
+def _service(history: list[ChatMessage], chain: FakeChain) -> ChatService:
+    service = ChatService.__new__(ChatService)
+    service.retrieval = FakeRetrieval()
+    service.chain = chain
+
+    async def load_history(conversation_id, exclude_id):
+        return history
+
+    service._load_history = load_history
+    return service
+
+
+async def _answer(service: ChatService, user_id: uuid.UUID) -> str:
+    events = [
+        event
+        async for event in service.stream_answer_sse(uuid.uuid4(), "question", user_id)
+    ]
+    return "".join(e.split("data:", 1)[1][:-2] for e in events if "event: token" in e)
+
+
+@pytest.mark.anyio
+async def test_first_turn_is_served_from_answer_cache(cache):
+    user_id = uuid.uuid4()
+    cache.store(user_id, QUERY_VECTOR, ["chunk-1"], "cached answer")
+    chain = FakeChain("fresh answer")
+
+    assert await _answer(_service([], chain), user_id) == "cached answer"
+    assert chain.calls == 0
+
+
+@pytest.mark.anyio
+async def test_follow_up_question_bypasses_answer_cache(cache):
+    user_id = uuid.uuid4()
+    cache.store(user_id, QUERY_VECTOR, ["chunk-1"], "cached answer")
+    history = [ChatMessage(role="user", content="tell me about the first one")]
+    chain = FakeChain("fresh answer")
+
+    assert await _answer(_service(history, chain), user_id) == "fresh answer"
+    assert chain.calls == 1
+    # The history-dependent answer must not be cached for later questions.
+    assert cache.stores == 1
@@ -0,0 +1,55 @@
+import uuid
+
+import pytest
+from langchain_core.documents import Document
+from pydantic import ValidationError
+
+from app.schemas.ingest import TextRecord
+from app.services.ingest_pipeline import IngestPipeline
+from app.services.ingest_service import record_metadata
+
+FILE_ID = uuid.uuid4()
+USER_ID = uuid.uuid4()
+VICTIM_ID = str(uuid.uuid4())
+
+
+class FakeWriter:
+    model = "text-embedding-3-small"
+
+
+@pytest.mark.parametrize("key", ["file_id", "user_id", "record_id", "source", "live"])
+def test_record_with_reserved_metadata_key_is_rejected(key):
+    with pytest.raises(ValidationError, match="reserved keys not allowed"):
+        TextRecord.model_validate(
+            {"id": "r1", "text": "hello", "metadata": {key: VICTIM_ID}}
+        )
+
+
+def test_record_metadata_keeps_server_keys():
+    record = TextRecord(id="r1", text="hello", metadata={"lang": "en", "tags": [1]})
+
+    assert record_metadata("import", record) == {
+        "lang": "en",
+        "tags": "[1]",
+        "source": "import",
+        "record_id": "r1",
+    }
+
+
+def test_chunk_metadata_cannot_override_owner():
+    pipeline = IngestPipeline(FakeWriter(), FILE_ID, USER_ID)
+    chunk = Document(
+        page_content="hello",
+        metadata={"file_id": VICTIM_ID, "user_id": VICTIM_ID, "page": 3},
+    )
+
+    batch = pipeline._cut([(chunk, 1, None)], 1.0)
+
+    assert batch.metadatas == [
+        {
+            "page": 3,
+            "file_id": str(FILE_ID),
+            "user_id": str(USER_ID),
+            "live": False,
+        }
+    ]
@@ -0,0 +1,34 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models.file_metadata import FileMetadata
+from app.services.ingest_job_service import upload_needed
+
+
+def _file(status: str, idle: float) -> FileMetadata:
+    return FileMetadata(
+        filename="a.pdf",
+        file_hash="0" * 64,
+        status=status,
+        updated_at=datetime.now(UTC) - timedelta(seconds=idle),
+    )
+
+
+@pytest.mark.parametrize(
+    "status, idle, needed",
+    [
+        ("failed", 0, True),
+        ("processing", 0, False),
+        ("processing", settings.INGEST_STALE_AFTER + 60, True),
+        ("processed", settings.INGEST_STALE_AFTER + 60, False),
+        ("superseded", 0, False),
+    ],
+)
+def test_upload_needed(status, idle, needed):
+    assert upload_needed(_file(status, idle)) is needed
+
+
+def test_upload_needed_for_unknown_file():
+    assert upload_needed(None)